@@ -4,186 +4,251 @@ Uses Claude's native tool calling to control the home.
 """
 
 import anthropic
+import atexit
+import concurrent.futures
+import hashlib
+import httpx
+import importlib.util
 import json
-import os
+import logging
+import platform
+import queue
 import re
+import shutil
+import subprocess
+import threading
 import time
-from datetime import datetime
+from collections import OrderedDict, deque
+from datetime import date, datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Callable, Generator
+from typing import Any, Deque, Optional, List, Dict, Callable, Generator, Tuple
 
 from config import config
+from agents.alfred_tools import ALFRED_TOOLS
+from personality.backstory import get_backstory_context
+from memory.user_profile import get_user_profile, get_profile_context, get_knowledge_gap_context
+from memory.conversation_store import get_conversation_store, get_conversation_context
+from memory.consolidation import get_consolidator, get_understanding_context
+from memory.relationships import get_relationship_graph, get_relationships_context
+from devices.lights import get_light_controller
+from devices.music import get_music_controller
+from devices.diffusers import get_diffuser_controller
+from devices.coffee import get_coffee_controller
+
+
+log = logging.getLogger("reality.alfred")
+
+
+def ttl_cache(seconds: float):
+    """
+    Memoize a zero-argument function for `seconds`. The wrapper gets a
+    cache_clear() for when the underlying state is known to have changed.
+    """
+    def decorator(fn: Callable[[], Any]) -> Callable[[], Any]:
+        entry: List = []  # [expiry, value] once filled
+
+        def wrapper():
+            now = time.monotonic()
+            if entry and now < entry[0]:
+                return entry[1]
+            value = fn()
+            entry[:] = [now + seconds, value]
+            return value
+
+        wrapper.cache_clear = entry.clear
+        return wrapper
+    return decorator
+
+
+def _make_http_client() -> httpx.Client:
+    """
+    The SDK's default HTTP client (its timeouts and redirect handling) with
+    a roomier keep-alive pool, so bursts of voice turns and background calls
+    reuse warm connections instead of re-handshaking. HTTP/2 is used when the
+    optional h2 package is installed.
+    """
+    return anthropic.DefaultHttpxClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60.0),
+    )
+
+
+# Loaded prompts by name: (mtime_ns, text)
+_PROMPT_CACHE: Dict[str, Tuple[int, str]] = {}
 
 
 def _load_prompt(name: str) -> str:
-    """Load a prompt from the prompts directory. Reloads each time for hot-reload support."""
+    """
+    Load a prompt from the prompts directory. Cached until the file's mtime
+    changes, so edits still hot-reload without re-reading it every turn.
+    """
     prompt_path = Path(__file__).parent.parent / "prompts" / f"{name}.txt"
     try:
-        return prompt_path.read_text()
+        mtime = prompt_path.stat().st_mtime_ns
+        cached = _PROMPT_CACHE.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        text = prompt_path.read_text()
     except FileNotFoundError:
-        print(f"[Alfred] Warning: Prompt file {prompt_path} not found")
+        log.warning("[Alfred] Prompt file %s not found", prompt_path)
         return ""
+    _PROMPT_CACHE[name] = (mtime, text)
+    return text
+
+
+# Model for Alfred's conversation turns
+MODEL = "claude-sonnet-4-20250514"
+
+# Cheap model for compacting trimmed history
+SUMMARY_MODEL = "claude-3-5-haiku-20241022"
+
+SUMMARIZE_EARLIER_PROMPT = """Summarize these earlier turns of a conversation between Alfred (an AI butler) and the user in at most 3 sentences.
+Preserve facts, requests, and user preferences. If an earlier summary is given, merge it in.
+
+{transcript}"""
+
+# Rough characters-per-token ratio for budgeting history locally
+CHARS_PER_TOKEN = 4
+
+# Host OS and (on macOS) the SwitchAudioSource binary, for the audio output tool
+_SYSTEM = platform.system()
+_SWITCH_AUDIO = shutil.which("SwitchAudioSource") if _SYSTEM == "Darwin" else None
+
+# Bound on how long a SwitchAudioSource call may take (seconds)
+AUDIO_SWITCH_TIMEOUT = 2.0
+
+# Relative volume words and absolute levels for the music volume action
+_VOLUME_UP = frozenset({"up", "louder", "higher"})
+_VOLUME_DOWN = frozenset({"down", "lower", "quieter"})
+_INT_RE = re.compile(r"^-?\d+$")
+
+# Shared pool for running a turn's tool calls concurrently (they're I/O bound)
+_TOOL_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="alfred-tool")
+
+# Device each tool drives. Calls to the same device run in the order Claude
+# asked for them; only calls to different devices run concurrently
+_TOOL_DEVICES = {
+    "control_lights": "lights",
+    "get_light_status": "lights",
+    "get_home_status": "lights",
+    "control_music": "music",
+    "get_music_status": "music",
+    "control_audio_output": "music",
+    "eucalyptus": "diffusers",
+    "orange": "diffusers",
+    "coffee": "coffee",
+}
+
+# Replies to repeated questions are reused for a short while
+REPLY_CACHE_SIZE = 128
+REPLY_CACHE_TTL = 60.0
+
+# Read-only tools whose state is already in the system prompt (and so in the
+# cache key) - a turn that used only these can still be cached
+_CACHEABLE_TOOLS = frozenset({"get_light_status", "get_home_status"})
+
+# Action tools whose result strings are already a fine spoken reply. When
+# every tool in a turn is one of these and succeeded, the follow-up call is skipped
+_INSTANT_REPLY_TOOLS = frozenset({"control_lights", "coffee", "eucalyptus", "orange"})
+
+# How the device controllers phrase a failure
+_FAILURE_PREFIXES = ("Error", "Unknown", "Failed", "Invalid", "Please", "I don't", "I didn't")
+
+# Abort a streaming call if no event arrives for this long (seconds)
+STREAM_STALL_TIMEOUT = 30.0
+
+
+def _estimate_tokens(message: Dict) -> int:
+    """Cheap token estimate for a history message - no API round trip."""
+    content = message["content"]
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    return len(content) // CHARS_PER_TOKEN + 4  # + role/framing overhead
+
+
+def _render_transcript(messages: List[Dict]) -> str:
+    """Render history messages (including tool blocks) as plain text."""
+    lines = []
+    for msg in messages:
+        role = "User" if msg["role"] == "user" else "Alfred"
+        content = msg["content"]
+        if isinstance(content, str):
+            lines.append(f"{role}: {content}")
+            continue
+        for block in content:
+            if block.get("type") == "text":
+                lines.append(f"{role}: {block['text']}")
+            elif block.get("type") == "tool_use":
+                lines.append(f"[Alfred used {block['name']}]")
+            elif block.get("type") == "tool_result":
+                lines.append(f"[Result: {block['content']}]")
+    return "\n".join(lines)
+
+
+def _reply_cache_key(user_input: str, system: List[Dict], previous_reply: Any) -> bytes:
+    """
+    Key a reply by the normalized question, the full system prompt it was
+    answered under, and the assistant turn it follows - so a follow-up like
+    "why?" is never answered with a reply meant for a different exchange.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(re.sub(r"\s+", " ", user_input.strip().lower()).encode())
+    h.update(b"\0")
+    if not isinstance(previous_reply, str):
+        previous_reply = json.dumps(previous_reply, default=str)
+    h.update(previous_reply.encode())
+    for block in system:
+        h.update(b"\0")
+        h.update(block["text"].encode())
+    return h.digest()
+
+
+def _tee(gen: Generator, sink: List[str]) -> Generator:
+    """Pass a generator's items through, appending each to sink. Returns its return value."""
+    try:
+        while True:
+            try:
+                item = next(gen)
+            except StopIteration as stop:
+                return stop.value
+            sink.append(item)
+            yield item
+    finally:
+        gen.close()
 
 
-from personality.backstory import get_backstory_context
-from memory.user_profile import get_profile_context, get_knowledge_gap_context
-from memory.conversation_store import get_conversation_store, get_conversation_context
-from memory.consolidation import get_consolidator, get_understanding_context
-from memory.relationships import get_relationship_graph, get_relationships_context
-from devices.lights import get_light_controller
-from devices.music import get_music_controller
-from devices.diffusers import get_diffuser_controller
-from devices.coffee import get_coffee_controller
+def _starts_exchange(message: Dict) -> bool:
+    """True if a message is a plain user turn (not a tool result)."""
+    return message["role"] == "user" and isinstance(message["content"], str)
 
 
-# Tool definitions - these are what Alfred can do
-ALFRED_TOOLS = [
-    {
-        "name": "control_lights",
-        "description": "Control the home's smart lights. Can turn on/off, set brightness, change color, or adjust warmth.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["on", "off", "brightness", "color", "warmth"],
-                    "description": "What to do with the lights"
-                },
-                "target": {
-                    "type": "string",
-                    "description": "Which lights: 'living room', 'kitchen', 'hallway', or 'all'"
-                },
-                "value": {
-                    "type": "string",
-                    "description": "For brightness: 0-100. For color: red/blue/green/etc. For warmth: warm/cool/neutral"
-                }
-            },
-            "required": ["action", "target"]
-        }
-    },
-    {
-        "name": "get_light_status",
-        "description": "Check the current state of all lights - whether on/off, brightness level, and color",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-            "required": []
-        }
-    },
-    {
-        "name": "get_home_status",
-        "description": "Get overall home status including door activity patterns and current light states",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-            "required": []
-        }
-    },
-    {
-        "name": "control_music",
-        "description": "Control music playback - play, pause, skip, volume, search for songs/artists/playlists",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["play", "pause", "toggle", "next", "previous", "volume", "search", "playlist", "shuffle"],
-                    "description": "What to do: play/pause/toggle playback, next/previous track, set volume, search for music, play a playlist, or toggle shuffle"
-                },
-                "query": {
-                    "type": "string",
-                    "description": "For search: song/artist/album name. For playlist: playlist name. For volume: 'up', 'down', or 0-100"
-                },
-                "app": {
-                    "type": "string",
-                    "enum": ["Music", "Spotify"],
-                    "description": "Which app to use (default: Apple Music)"
-                }
-            },
-            "required": ["action"]
-        }
-    },
-    {
-        "name": "get_music_status",
-        "description": "Get what's currently playing, player state, and volume level",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "app": {
-                    "type": "string",
-                    "enum": ["Music", "Spotify"],
-                    "description": "Which app to check (default: Apple Music)"
-                }
-            },
-            "required": []
-        }
-    },
-    {
-        "name": "control_audio_output",
-        "description": "Switch system audio output to a different speaker. Music uses External Headphones (Audioengine via AUX), Alfred's voice uses Yealink SP92.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["switch", "list", "current"],
-                    "description": "switch to a device, list available devices, or get current device"
-                },
-                "device": {
-                    "type": "string",
-                    "enum": ["External Headphones", "Yealink SP92", "Mac mini Speakers"],
-                    "description": "Device to switch to (for switch action)"
-                }
-            },
-            "required": ["action"]
-        }
-    },
-    {
-        "name": "eucalyptus",
-        "description": "Control the eucalyptus scent diffuser. Fresh, clean scent - energizing and clarifying. Good for focus and clear thinking.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["on", "off", "status"],
-                    "description": "Turn the eucalyptus diffuser on, off, or check its status"
-                }
-            },
-            "required": ["action"]
-        }
-    },
-    {
-        "name": "orange",
-        "description": "Control the orange scent diffuser. Warm, citrus scent - uplifting and cheerful. Good for mood and welcoming guests.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["on", "off", "status"],
-                    "description": "Turn the orange diffuser on, off, or check its status"
-                }
-            },
-            "required": ["action"]
-        }
-    },
-    {
-        "name": "coffee",
-        "description": "Control the coffee maker. Turning it on starts brewing. The coffee maker is connected via smart plug.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["brew", "off", "status"],
-                    "description": "Start brewing coffee, turn off the coffee maker, or check its status"
-                }
-            },
-            "required": ["action"]
-        }
-    }
-]
+class _StallWatchdog:
+    """
+    Dead-man timer for a streaming call. feed() on every event; if none
+    arrives within timeout, on_stall is called (to close the stream) from
+    the watchdog thread.
+    """
+
+    def __init__(self, timeout: float, on_stall: Callable[[], None]):
+        self.timeout = timeout
+        self.on_stall = on_stall
+        self.stalled = False
+        self._last = time.monotonic()
+        self._done = threading.Event()
+        threading.Thread(target=self._watch, name="alfred-watchdog", daemon=True).start()
+
+    def feed(self):
+        self._last = time.monotonic()
+
+    def cancel(self):
+        self._done.set()
+
+    def _watch(self):
+        while not self._done.wait(1.0):
+            if time.monotonic() - self._last > self.timeout:
+                self.stalled = True
+                self.on_stall()
+                return
 
 
 class AlfredAgent:
@@ -196,99 +261,376 @@ class AlfredAgent:
         if not config.ANTHROPIC_API_KEY:
             raise ValueError("ANTHROPIC_API_KEY not configured")
 
-        self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
-        self.conversation_history: List[Dict] = []
-        self.max_history = 20
+        self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY, http_client=_make_http_client())
+        # No maxlen - trimming is by token budget, see _trim_history
+        self.conversation_history: Deque[Dict] = deque()
+        # Token budget for the stable prompt plus history: once past the
+        # high-water mark, trim down to the low-water mark in one go so the
+        # message prefix stays cacheable
+        self.history_high_tokens = 64_000
+        self.history_low_tokens = 32_000
+        # Backstop on message count, for long runs of tiny turns that never
+        # reach the token budget. Enforced by _trim_history rather than a deque
+        # maxlen, which would drop single messages and orphan tool results
+        self.max_history_messages = 400
+        # Trims drop a multiple of this many messages, so the cut points
+        # (and with them the cached message prefix) move as rarely as possible
+        self._trim_block = 8
+        # Running totals so the budget check is O(1) per turn. History is
+        # estimated locally; the stable prompt is counted by the API once per rebuild.
+        self._history_tokens = 0
+        self._stable_tokens = 0
+        # Summary of turns trimmed out of the history. Written by a background
+        # job on the context pool; _history_epoch tells it the history was reset
+        self._rolling_summary = ""
+        self._summary_lock = threading.Lock()
+        self._summary_job_lock = threading.Lock()
+        self._history_epoch = 0
         self.home_context_provider = home_context_provider
-        self.last_interaction_time: float = 0
+        self.last_interaction_time: float = 0  # time.monotonic() of last reply
         self.conversation_timeout = 300
+        # Fires once the conversation has been idle for conversation_timeout
+        self._idle_timer: Optional[threading.Timer] = None
+        self._responding = False
+        # Guards _responding and the idle save/reset of history against a turn starting
+        self._history_lock = threading.Lock()
+        # Conversations are written to memory off the voice loop
+        self._save_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._save_thread = threading.Thread(target=self._save_worker, name="alfred-save", daemon=True)
+        self._save_thread.start()
+        self._closed = False
+        # Pending saves must land even if the process exits without close()
+        atexit.register(self.close)
+        # Context providers are independent, so they are queried in parallel
+        self._ctx_pool = concurrent.futures.ThreadPoolExecutor(max_workers=10, thread_name_prefix="alfred-ctx")
+        # Deadline for the volatile providers; the stable ones are always waited for
+        self.context_timeout = 0.5
+        # Last call per provider, so one that overran isn't piled up again
+        self._ctx_inflight: Dict[str, concurrent.futures.Future] = {}
+        # Last good value of each stable section, used if its provider fails
+        self._stable_sections: Dict[str, Any] = {}
+        # Recent replies: cache key -> (expiry, reply). See _reply_cache_key
+        self._reply_cache: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        # Names of the tools used during the current turn
+        self._turn_tools: List[str] = []
+        # Volatile context changes on a seconds-to-minutes scale, not per turn
+        self._lights_context = ttl_cache(15.0)(lambda: self.light_controller.get_detailed_status())
+        self._home_context = ttl_cache(5.0)(home_context_provider) if home_context_provider else None
+        self._gap_context = ttl_cache(60.0)(get_knowledge_gap_context)
+        # needs_consolidation() reads the clock and parses a timestamp - once a minute is plenty
+        self._maybe_consolidate = ttl_cache(60.0)(lambda: get_consolidator().maybe_consolidate())
         self.light_controller = get_light_controller()
         self.music_controller = get_music_controller()
         self.diffuser_controller = get_diffuser_controller()
         self.coffee_controller = get_coffee_controller()
+        self._build_dispatch_tables()
+        # Assembled stable prompt, reused until a backing store changes
+        self._stable_prompt_key: Optional[tuple] = None
+        self._stable_prompt = ""
 
-        print("[Alfred] Agent initialized")
+        log.info("[Alfred] Agent initialized")
+
+    def _build_dispatch_tables(self):
+        """Map tool names and actions straight to their handlers."""
+        mc = self.music_controller
+        self._tool_dispatch: Dict[str, Callable[[dict], str]] = {
+            "control_lights": lambda i: self._control_lights(i.get("action"), i.get("target"), i.get("value")),
+            "get_light_status": lambda i: self.light_controller.get_detailed_status(),
+            "get_home_status": lambda i: self._get_home_status(),
+            "control_music": lambda i: self._control_music(i.get("action"), i.get("query"), i.get("app")),
+            "get_music_status": lambda i: mc.get_status(i.get("app")),
+            "control_audio_output": lambda i: self._control_audio_output(i.get("action"), i.get("device")),
+            "eucalyptus": lambda i: self._control_diffuser("eucalyptus", i.get("action")),
+            "orange": lambda i: self._control_diffuser("orange", i.get("action")),
+            "coffee": lambda i: self._control_coffee(i.get("action")),
+        }
+        self._music_dispatch: Dict[str, Callable[[Optional[str], Optional[str]], str]] = {
+            "play": self._music_play,
+            "pause": lambda q, app: mc.pause(app),
+            "toggle": lambda q, app: mc.toggle_playback(app),
+            "next": lambda q, app: mc.next_track(app),
+            "previous": lambda q, app: mc.previous_track(app),
+            "volume": self._music_volume,
+            "search": self._music_search,
+            "playlist": self._music_playlist,
+            "shuffle": lambda q, app: mc.shuffle(True, app),
+        }
+        dc = self.diffuser_controller
+        self._diffuser_dispatch: Dict[str, Callable[[str], str]] = {
+            "on": dc.turn_on,
+            "off": dc.turn_off,
+            "status": dc.get_scent_info,
+        }
+        cc = self.coffee_controller
+        self._coffee_dispatch: Dict[str, Callable[[], str]] = {
+            "brew": cc.brew,
+            "off": cc.turn_off,
+            "status": cc.get_status,
+        }
 
     def respond(self, user_input: str) -> Optional[str]:
         """Generate a response, using tools when needed."""
+        return "".join(self.respond_stream(user_input))
+
+    def respond_stream(self, user_input: str) -> Generator[str, None, None]:
+        """
+        Generate a response as a stream of text chunks, using tools when needed.
+        Text is yielded as Claude produces it so speech can start early.
+        The generator must be fully consumed for the turn to be recorded.
+        """
+        self._cancel_idle_timer()
+        with self._history_lock:
+            # Once _responding is set, the idle timer leaves history alone
+            self._responding = True
         try:
             self.check_conversation_timeout()
 
+            # The assistant turn this question follows up on, if any
+            previous_reply = next(
+                (m["content"] for m in reversed(self.conversation_history) if m["role"] == "assistant"),
+                "",
+            )
+
             # Add user message
-            self.conversation_history.append({
+            self._append_history({
                 "role": "user",
                 "content": user_input
             })
 
             # Trim history
-            if len(self.conversation_history) > self.max_history * 2:
-                self.conversation_history = self.conversation_history[-self.max_history * 2:]
-
-            print(f"[Alfred] Thinking...")
-
-            # Build system prompt with all context
-            system_prompt = self._build_system_prompt()
-
-            # Call Claude with tools
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=500,
-                temperature=0.7,
-                system=system_prompt,
-                messages=self.conversation_history,
-                tools=ALFRED_TOOLS,
-            )
+            self._trim_history()
+
+            # The same question under the same context gets the same answer
+            system = self._build_system_prompt()
+            cache_key = _reply_cache_key(user_input, system, previous_reply)
+            reply = self._cached_reply(cache_key)
+
+            if reply is not None:
+                log.debug("[Alfred] Reply cache hit")
+                yield reply
+            else:
+                log.debug("[Alfred] Thinking...")
+                self._turn_tools = []
+
+                # Everything spoken this turn, preamble included, for the cache
+                spoken: List[str] = []
+
+                # Call Claude with tools
+                response = yield from _tee(self._stream_message(max_tokens=500, system=system), spoken)
+
+                # Process response (may involve tool calls)
+                reply = yield from _tee(self._process_response(response), spoken)
 
-            # Process response (may involve tool calls)
-            reply = self._process_response(response)
+                if reply and all(name in _CACHEABLE_TOOLS for name in self._turn_tools):
+                    self._cache_reply(cache_key, "".join(spoken).strip())
 
             # Add to history
-            self.conversation_history.append({
+            self._append_history({
                 "role": "assistant",
                 "content": reply
             })
 
-            print(f"[Alfred] Response: {reply}")
-            self.last_interaction_time = time.time()
-            return reply
+            log.debug("[Alfred] Response: %s", reply)
+            self.last_interaction_time = time.monotonic()
 
         except Exception as e:
-            print(f"[Alfred] Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return "I'm sorry, sir. I seem to be having a moment. Could you try again?"
-
-    def _process_response(self, response) -> str:
-        """Process Claude's response, executing any tool calls."""
-
-        # Check for tool use
-        tool_uses = [block for block in response.content if block.type == "tool_use"]
-        text_blocks = [block for block in response.content if block.type == "text"]
+            log.exception("[Alfred] Turn failed: %s", e)
+            yield "I'm sorry, sir. I seem to be having a moment. Could you try again?"
+
+        finally:
+            with self._history_lock:
+                self._responding = False
+            self._schedule_idle_timer()
+
+    def _cached_reply(self, key: bytes) -> Optional[str]:
+        """Return a still-fresh cached reply, or None."""
+        entry = self._reply_cache.get(key)
+        if not entry:
+            return None
+        expiry, reply = entry
+        if time.monotonic() > expiry:
+            del self._reply_cache[key]
+            return None
+        self._reply_cache.move_to_end(key)
+        return reply
+
+    def _cache_reply(self, key: bytes, reply: str):
+        """Remember a reply, evicting the least recently used past the size limit."""
+        self._reply_cache[key] = (time.monotonic() + REPLY_CACHE_TTL, reply)
+        self._reply_cache.move_to_end(key)
+        while len(self._reply_cache) > REPLY_CACHE_SIZE:
+            self._reply_cache.popitem(last=False)
+
+    def _schedule_idle_timer(self):
+        """(Re)arm the idle timer that saves the conversation after a quiet spell."""
+        self._cancel_idle_timer()
+        if not self.conversation_history:
+            return
+        self._idle_timer = threading.Timer(self.conversation_timeout, self._on_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        """Cancel a pending idle timer, if any."""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _on_idle(self):
+        """Idle timer callback - save the conversation unless a turn is in flight."""
+        with self._history_lock:
+            if self._responding:
+                return
+            self.check_conversation_timeout()
 
-        if not tool_uses:
-            # No tools - just return text
-            if text_blocks:
-                return text_blocks[0].text.strip()
-            return ""
+    def _stream_message(self, max_tokens: int, system: Optional[List[Dict]] = None):
+        """
+        Stream a Claude call over the current history with full context.
+        Yields text deltas as they arrive and returns the final message.
+        The system prompt is built fresh unless one is passed in.
+        """
+        options = {}
+        if config.ANTHROPIC_LATENCY_MODE:
+            options["extra_body"] = {
+                "performance_config": {"latency": config.ANTHROPIC_LATENCY_MODE}
+            }
+
+        with self.client.messages.stream(
+            model=MODEL,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            system=system if system is not None else self._build_system_prompt(),
+            messages=list(self.conversation_history),
+            tools=ALFRED_TOOLS,
+            **options,
+        ) as stream:
+            watchdog = _StallWatchdog(STREAM_STALL_TIMEOUT, stream.close)
+            try:
+                for event in stream:
+                    watchdog.feed()
+                    if event.type == "text":
+                        yield event.text
+            except Exception:
+                if watchdog.stalled:
+                    raise TimeoutError(f"No response from Claude for {STREAM_STALL_TIMEOUT:.0f}s")
+                raise
+            finally:
+                watchdog.cancel()
+            if watchdog.stalled:
+                raise TimeoutError(f"No response from Claude for {STREAM_STALL_TIMEOUT:.0f}s")
+            return stream.get_final_message()
+
+    def _append_history(self, message: Dict):
+        """Append a message to history, keeping the running token total."""
+        self.conversation_history.append(message)
+        self._history_tokens += _estimate_tokens(message)
+
+    def _reset_history(self):
+        """Empty the history and everything derived from it."""
+        self.conversation_history.clear()
+        self._history_tokens = 0
+        with self._summary_lock:
+            self._history_epoch += 1
+            self._rolling_summary = ""
+
+    def _trim_history(self):
+        """
+        Trim history by token budget rather than message count.
+        Only fires past the high-water mark (or the message-count backstop),
+        then drops whole exchanges (never splitting a tool call from its
+        result) until under the low-water mark and half the backstop.
+        """
+        history = self.conversation_history
+        total = self._stable_tokens + self._history_tokens
+        if total <= self.history_high_tokens and len(history) <= self.max_history_messages:
+            return
 
-        # Execute tools
-        tool_results = []
-        for tool_use in tool_uses:
-            print(f"[Alfred] Using tool: {tool_use.name}")
-            result = self._execute_tool(tool_use.name, tool_use.input)
-            print(f"[Alfred] Tool result: {result}")
-            tool_results.append({
-                "type": "tool_result",
-                "tool_use_id": tool_use.id,
-                "content": result
-            })
+        cut = 0
+        last = len(history) - 1  # Always keep the newest message
+        keep = self.max_history_messages // 2
+        while cut < last and (total > self.history_low_tokens or len(history) - cut > keep):
+            total -= _estimate_tokens(history[cut])
+            cut += 1
+        # Round up to a whole number of blocks
+        cut = min(-(-cut // self._trim_block) * self._trim_block, last)
+        # Advance to the start of the next exchange
+        while cut < last and not _starts_exchange(history[cut]):
+            cut += 1
+
+        if cut:
+            log.info("[Alfred] Trimmed %d old messages from history", cut)
+            dropped = [history.popleft() for _ in range(cut)]
+            self._history_tokens -= sum(_estimate_tokens(m) for m in dropped)
+            # Summarized off the voice path; the summary lands on a later turn
+            self._ctx_pool.submit(self._summarize_dropped, dropped, self._history_epoch)
+
+    def _count_stable_tokens(self, stable: str):
+        """
+        Count the stable prompt's tokens with the API (runs on the context pool,
+        off the voice path). Falls back to the local estimate on failure.
+        """
+        try:
+            result = self.client.messages.count_tokens(
+                model=MODEL,
+                system=[{"type": "text", "text": stable}],
+                messages=[{"role": "user", "content": "."}],
+            )
+            self._stable_tokens = result.input_tokens
+        except Exception as e:
+            log.warning("[Alfred] Could not count prompt tokens: %s", e)
+            self._stable_tokens = len(stable) // CHARS_PER_TOKEN
+
+    def _summarize_dropped(self, dropped: List[Dict], epoch: int):
+        """
+        Fold trimmed messages into the rolling earlier-conversation summary.
+        Runs on the context pool; the result is discarded if the history was
+        reset in the meantime.
+        """
+        # One job at a time, so back-to-back trims each build on the previous summary
+        with self._summary_job_lock:
+            with self._summary_lock:
+                if epoch != self._history_epoch:
+                    return
+                transcript = _render_transcript(dropped)
+                if self._rolling_summary:
+                    transcript = f"Earlier summary: {self._rolling_summary}\n\n{transcript}"
 
-        # Build assistant message with tool use for history
+            try:
+                response = self.client.messages.create(
+                    model=SUMMARY_MODEL,
+                    max_tokens=200,
+                    temperature=0,
+                    messages=[{
+                        "role": "user",
+                        "content": SUMMARIZE_EARLIER_PROMPT.format(transcript=transcript)
+                    }]
+                )
+            except Exception as e:
+                log.warning("[Alfred] Could not summarize trimmed history: %s", e)
+                return
+
+            with self._summary_lock:
+                if epoch == self._history_epoch:
+                    self._rolling_summary = response.content[0].text.strip()
+
+    def _process_response(self, response) -> Generator[str, None, str]:
+        """
+        Process Claude's response, executing any tool calls.
+        Streams the follow-up text after tools run; returns the final reply.
+        Text streamed ahead of a tool call (the preamble) was already spoken;
+        it's recorded in the tool-use turn and the reply picks up after it.
+        """
+
+        # One pass: collect tool calls and text, and the assistant message for history
+        tool_uses = []
+        text_blocks = []
         assistant_content = []
         for block in response.content:
             if block.type == "text":
+                text_blocks.append(block)
                 assistant_content.append({"type": "text", "text": block.text})
             elif block.type == "tool_use":
+                tool_uses.append(block)
                 assistant_content.append({
                     "type": "tool_use",
                     "id": block.id,
@@ -296,176 +638,191 @@ class AlfredAgent:
                     "input": block.input
                 })
 
-        # Add to history
-        self.conversation_history.append({
+        # Everything streamed so far
+        spoken = "".join(block.text for block in text_blocks).strip()
+
+        if not tool_uses:
+            # No tools - just return text
+            return spoken
+
+        # Execute tools - results keep their order
+        for tool_use in tool_uses:
+            log.info("[Alfred] Using tool: %s", tool_use.name)
+            self._turn_tools.append(tool_use.name)
+        results = self._execute_tools(tool_uses)
+
+        # Tools may have changed the home - the follow-up must see fresh state
+        self._lights_context.cache_clear()
+        if self._home_context:
+            self._home_context.cache_clear()
+
+        tool_results = []
+        for tool_use, result in zip(tool_uses, results):
+            log.debug("[Alfred] Tool result: %s", result)
+            tool_results.append({
+                "type": "tool_result",
+                "tool_use_id": tool_use.id,
+                "content": result
+            })
+
+        # Add to history - assistant_content carries the spoken preamble, if any
+        self._append_history({
             "role": "assistant",
             "content": assistant_content
         })
-        self.conversation_history.append({
+        self._append_history({
             "role": "user",
             "content": tool_results
         })
 
+        # Keep the preamble and what follows it as separate sentences
+        if spoken:
+            yield " "
+
+        # Simple commands that worked don't need Claude to phrase the acknowledgement
+        instant = self._instant_reply(tool_uses, results, acknowledged=bool(spoken))
+        if instant:
+            yield instant
+            return instant
+
         # Get final response after tool execution
-        follow_up = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=200,
-            temperature=0.7,
-            system=self._build_system_prompt(),
-            messages=self.conversation_history,
-            tools=ALFRED_TOOLS,
-        )
+        follow_up = yield from self._stream_message(max_tokens=200)
 
         # Extract text (shouldn't have more tool calls for simple actions)
-        for block in follow_up.content:
-            if block.type == "text":
-                return block.text.strip()
+        reply = "".join(block.text for block in follow_up.content if block.type == "text").strip()
+        if reply:
+            return reply
 
+        yield "Done."
         return "Done."
 
+    def _instant_reply(self, tool_uses: list, results: List[str], acknowledged: bool = False) -> Optional[str]:
+        """
+        A templated reply if every tool was a whitelisted action that succeeded,
+        else None. acknowledged means Claude already said something, so the
+        "Very good, sir." opener is left off.
+        """
+        for tool_use, result in zip(tool_uses, results):
+            if tool_use.name not in _INSTANT_REPLY_TOOLS:
+                return None
+            if tool_use.input.get("action") == "status":
+                return None  # Questions deserve a real answer
+            if not result or result.startswith(_FAILURE_PREFIXES):
+                return None
+
+        sentences = [r if r.endswith((".", "!", "?")) else f"{r}." for r in results]
+        reply = " ".join(sentences)
+        return reply if acknowledged else f"Very good, sir. {reply}"
+
+    def _execute_tools(self, tool_uses: list) -> List[str]:
+        """
+        Run a turn's tool calls. Calls to the same device run one after another
+        in the order given (e.g. "all off" then "kitchen on"); different
+        devices are driven concurrently.
+        """
+        by_device: Dict[str, List[int]] = {}
+        for i, tool_use in enumerate(tool_uses):
+            by_device.setdefault(_TOOL_DEVICES.get(tool_use.name, tool_use.name), []).append(i)
+
+        results: List[Optional[str]] = [None] * len(tool_uses)
+
+        def run(indices: List[int]):
+            for i in indices:
+                results[i] = self._execute_tool(tool_uses[i].name, tool_uses[i].input)
+
+        if len(by_device) == 1:
+            run(range(len(tool_uses)))
+        else:
+            for future in [_TOOL_POOL.submit(run, indices) for indices in by_device.values()]:
+                future.result()
+        return results
+
     def _execute_tool(self, name: str, inputs: dict) -> str:
         """Execute a tool and return the result."""
+        handler = self._tool_dispatch.get(name)
+        if not handler:
+            return f"Unknown tool: {name}"
         try:
-            if name == "control_lights":
-                return self._control_lights(
-                    inputs.get("action"),
-                    inputs.get("target"),
-                    inputs.get("value")
-                )
-            elif name == "get_light_status":
-                return self.light_controller.get_detailed_status()
-            elif name == "get_home_status":
-                return self._get_home_status()
-            elif name == "control_music":
-                return self._control_music(
-                    inputs.get("action"),
-                    inputs.get("query"),
-                    inputs.get("app")
-                )
-            elif name == "get_music_status":
-                return self.music_controller.get_status(inputs.get("app"))
-            elif name == "control_audio_output":
-                return self._control_audio_output(
-                    inputs.get("action"),
-                    inputs.get("device")
-                )
-            elif name == "eucalyptus":
-                return self._control_diffuser("eucalyptus", inputs.get("action"))
-            elif name == "orange":
-                return self._control_diffuser("orange", inputs.get("action"))
-            elif name == "coffee":
-                return self._control_coffee(inputs.get("action"))
-            else:
-                return f"Unknown tool: {name}"
+            return handler(inputs)
         except Exception as e:
-            print(f"[Alfred] Tool error: {e}")
+            log.warning("[Alfred] Tool error: %s", e)
             return f"Error: {e}"
 
+    # action -> (method for "all", method for one target, value -> argument)
+    _LIGHT_ACTIONS = {
+        "on": ("turn_all_on", "turn_on", None),
+        "off": ("turn_all_off", "turn_off", None),
+        "brightness": ("set_all_brightness", "set_brightness", lambda v: int(v) if v else 100),
+        "color": ("set_all_color", "set_color", lambda v: v or "white"),
+        "warmth": ("set_all_color_temp", "set_color_temp", lambda v: v or "neutral"),
+    }
+
     def _control_lights(self, action: str, target: str, value: str = None) -> str:
         """Execute a light control action."""
-        lc = self.light_controller
-        target_lower = target.lower() if target else ""
-
-        if action == "on":
-            if target_lower == "all":
-                return lc.turn_all_on()
-            return lc.turn_on(target)
-
-        elif action == "off":
-            if target_lower == "all":
-                return lc.turn_all_off()
-            return lc.turn_off(target)
-
-        elif action == "brightness":
-            brightness = int(value) if value else 100
-            if target_lower == "all":
-                return lc.set_all_brightness(brightness)
-            return lc.set_brightness(target, brightness)
-
-        elif action == "color":
-            color = value or "white"
-            if target_lower == "all":
-                return lc.set_all_color(color)
-            return lc.set_color(target, color)
-
-        elif action == "warmth":
-            warmth = value or "neutral"
-            if target_lower == "all":
-                return lc.set_all_color_temp(warmth)
-            return lc.set_color_temp(target, warmth)
-
-        return f"Unknown action: {action}"
+        entry = self._LIGHT_ACTIONS.get(action)
+        if not entry:
+            return f"Unknown action: {action}"
+
+        all_method, one_method, convert = entry
+        args = () if convert is None else (convert(value),)
+        if target and target.lower() == "all":
+            return getattr(self.light_controller, all_method)(*args)
+        return getattr(self.light_controller, one_method)(target, *args)
 
     def _control_music(self, action: str, query: str = None, app: str = None) -> str:
         """Execute a music control action."""
-        mc = self.music_controller
+        handler = self._music_dispatch.get(action)
+        if not handler:
+            return f"Unknown music action: {action}"
+        return handler(query, app)
 
-        if action == "play":
-            if query:
-                return mc.search_and_play(query, app)
-            return mc.play(app)
-
-        elif action == "pause":
-            return mc.pause(app)
-
-        elif action == "toggle":
-            return mc.toggle_playback(app)
-
-        elif action == "next":
-            return mc.next_track(app)
-
-        elif action == "previous":
-            return mc.previous_track(app)
-
-        elif action == "volume":
-            if query:
-                # Check for up/down
-                if query.lower() in ["up", "louder", "higher"]:
-                    return mc.adjust_volume("up")
-                elif query.lower() in ["down", "lower", "quieter"]:
-                    return mc.adjust_volume("down")
-                # Otherwise treat as absolute level
-                try:
-                    level = int(query)
-                    return mc.set_volume(level)
-                except ValueError:
-                    return f"Invalid volume: {query}. Use 'up', 'down', or 0-100"
-            return mc.get_volume()
+    def _music_play(self, query: Optional[str], app: Optional[str]) -> str:
+        if query:
+            return self.music_controller.search_and_play(query, app)
+        return self.music_controller.play(app)
 
-        elif action == "search":
-            if query:
-                return mc.search_and_play(query, app)
-            return "Please specify what to search for"
-
-        elif action == "playlist":
-            if query:
-                return mc.play_playlist(query, app)
-            return "Please specify a playlist name"
-
-        elif action == "shuffle":
-            return mc.shuffle(True, app)
-
-        return f"Unknown music action: {action}"
+    def _music_volume(self, query: Optional[str], app: Optional[str]) -> str:
+        mc = self.music_controller
+        if not query:
+            return mc.get_volume()
+        # Check for up/down
+        q = query.strip().lower()
+        if q in _VOLUME_UP:
+            return mc.adjust_volume("up")
+        elif q in _VOLUME_DOWN:
+            return mc.adjust_volume("down")
+        # Otherwise treat as absolute level
+        if _INT_RE.match(q):
+            return mc.set_volume(int(q))
+        return f"Invalid volume: {query}. Use 'up', 'down', or 0-100"
+
+    def _music_search(self, query: Optional[str], app: Optional[str]) -> str:
+        if query:
+            return self.music_controller.search_and_play(query, app)
+        return "Please specify what to search for"
+
+    def _music_playlist(self, query: Optional[str], app: Optional[str]) -> str:
+        if query:
+            return self.music_controller.play_playlist(query, app)
+        return "Please specify a playlist name"
 
     def _control_audio_output(self, action: str, device: str = None) -> str:
         """Control system audio output device."""
-        import platform
-        import subprocess
-
-        system = platform.system()
+        if _SYSTEM == "Darwin":  # macOS
+            if not _SWITCH_AUDIO:
+                return "Audio output control needs SwitchAudioSource (brew install switchaudio-osx)"
 
-        if system == "Darwin":  # macOS
             if action == "current":
                 result = subprocess.run(
-                    ["SwitchAudioSource", "-c"],
-                    capture_output=True, text=True
+                    [_SWITCH_AUDIO, "-c"],
+                    capture_output=True, text=True, check=False, timeout=AUDIO_SWITCH_TIMEOUT
                 )
                 return f"Current audio output: {result.stdout.strip()}"
 
             elif action == "list":
                 result = subprocess.run(
-                    ["SwitchAudioSource", "-a", "-t", "output"],
-                    capture_output=True, text=True
+                    [_SWITCH_AUDIO, "-a", "-t", "output"],
+                    capture_output=True, text=True, check=False, timeout=AUDIO_SWITCH_TIMEOUT
                 )
                 return f"Available outputs:\n{result.stdout.strip()}"
 
@@ -473,14 +830,15 @@ class AlfredAgent:
                 if not device:
                     return "Please specify a device to switch to"
                 result = subprocess.run(
-                    ["SwitchAudioSource", "-s", device],
-                    capture_output=True, text=True
+                    [_SWITCH_AUDIO, "-s", device],
+                    capture_output=True, text=True, check=False, timeout=AUDIO_SWITCH_TIMEOUT
                 )
                 if result.returncode == 0:
+                    self.music_controller.output_changed(device)
                     return f"Switched audio output to: {device}"
                 return f"Error switching to {device}: {result.stderr.strip()}"
 
-        elif system == "Windows":
+        elif _SYSTEM == "Windows":
             # Audio device switching on Windows requires additional setup
             # User should set default audio device in Windows Sound settings
             if action == "current":
@@ -494,29 +852,17 @@ class AlfredAgent:
 
     def _control_diffuser(self, scent: str, action: str) -> str:
         """Control a scent diffuser."""
-        dc = self.diffuser_controller
-
-        if action == "on":
-            return dc.turn_on(scent)
-        elif action == "off":
-            return dc.turn_off(scent)
-        elif action == "status":
-            return dc.get_scent_info(scent)
-        else:
+        handler = self._diffuser_dispatch.get(action)
+        if not handler:
             return f"Unknown diffuser action: {action}"
+        return handler(scent)
 
     def _control_coffee(self, action: str) -> str:
         """Control the coffee maker."""
-        cc = self.coffee_controller
-
-        if action == "brew":
-            return cc.brew()
-        elif action == "off":
-            return cc.turn_off()
-        elif action == "status":
-            return cc.get_status()
-        else:
+        handler = self._coffee_dispatch.get(action)
+        if not handler:
             return f"Unknown coffee action: {action}"
+        return handler()
 
     def _get_home_status(self) -> str:
         """Get combined home status."""
@@ -535,104 +881,215 @@ class AlfredAgent:
 
         return "\n".join(parts)
 
-    def _build_system_prompt(self) -> str:
-        """Build full system prompt with context. Loads prompt fresh each time for hot-reload."""
-        prompt = _load_prompt("alfred")
-
-        # Add current time
-        now = datetime.now()
-        time_str = now.strftime("%A, %B %d, %Y at %I:%M %p")
-        prompt += f"\n<current_time>\n{time_str}\n</current_time>\n"
+    def _gather_context(self, providers: Dict[str, Callable[[], Any]], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run context providers in parallel so prompt assembly costs the slowest
+        one rather than the sum. Providers that fail, take longer than timeout,
+        or are still running from an earlier call are left out of the result.
+        """
+        futures = {}
+        for name, fn in providers.items():
+            pending = self._ctx_inflight.get(name)
+            if pending and not pending.done():
+                log.warning("[Alfred] Context provider '%s' still running from an earlier turn", name)
+                continue
+            futures[name] = self._ctx_inflight[name] = self._ctx_pool.submit(fn)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        results = {}
+        for name, future in futures.items():
+            try:
+                remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                results[name] = future.result(timeout=remaining)
+            except concurrent.futures.TimeoutError:
+                log.warning("[Alfred] Context provider '%s' timed out", name)
+            except Exception as e:
+                log.warning("[Alfred] Context provider '%s' failed: %s", name, e)
+        return results
+
+    def _build_stable_context(self, prompt: str) -> str:
+        """
+        Append the slow-changing memory sections to the base prompt. A section
+        whose provider fails keeps its last good value rather than vanishing.
+        """
+        providers = {
+            "backstory": get_backstory_context,
+            "profile": get_profile_context,
+            "understanding": get_understanding_context,
+            "history": get_conversation_context,
+            "relationships": get_relationships_context,
+        }
+        ctx = self._gather_context(providers)
+        self._stable_sections.update(ctx)
+        ctx = self._stable_sections
+        parts = [prompt]
 
         # Add backstory
-        backstory = get_backstory_context()
+        backstory = ctx.get("backstory")
         if backstory:
-            prompt += f"\n<your_history>\n{backstory}\n</your_history>\n"
+            parts.append(f"\n<your_history>\n{backstory}\n</your_history>\n")
 
         # Add user profile
-        profile = get_profile_context()
+        profile = ctx.get("profile")
         if profile:
-            prompt += f"\n<what_you_know_about_them>\n{profile}\n</what_you_know_about_them>\n"
+            parts.append(f"\n<what_you_know_about_them>\n{profile}\n</what_you_know_about_them>\n")
 
         # Add understanding
-        try:
-            consolidator = get_consolidator()
-            consolidator.maybe_consolidate()
-            understanding = get_understanding_context()
-            if understanding:
-                prompt += f"\n<your_understanding>\n{understanding}\n</your_understanding>\n"
-        except Exception:
-            pass
+        understanding = ctx.get("understanding")
+        if understanding:
+            parts.append(f"\n<your_understanding>\n{understanding}\n</your_understanding>\n")
 
         # Add conversation history
-        history = get_conversation_context()
+        history = ctx.get("history")
         if history:
-            prompt += f"\n<past_conversations>\n{history}\n</past_conversations>\n"
+            parts.append(f"\n<past_conversations>\n{history}\n</past_conversations>\n")
 
         # Add relationship context (people you know)
-        relationships = get_relationships_context()
+        relationships = ctx.get("relationships")
         if relationships:
-            prompt += f"\n<people_you_know>\n{relationships}\n</people_you_know>\n"
+            parts.append(f"\n<people_you_know>\n{relationships}\n</people_you_know>\n")
 
-        # Add pending clarifications about people
+        return "".join(parts)
+
+    def _build_static_prefix(self) -> str:
+        """
+        The stable part of the system prompt: alfred.txt plus the memory
+        sections. Loads the prompt fresh each time for hot-reload, but only
+        re-assembles when the prompt or a backing store has changed.
+        """
+        prompt = _load_prompt("alfred")
+
+        # Consolidation may rewrite the understanding, so run it before keying
+        consolidator = None
         try:
-            graph = get_relationship_graph()
-            clarification = graph.get_pending_clarification()
-            if clarification:
-                matches_desc = ", ".join(
-                    f"{m['name']} ({m.get('relationship_type', 'unknown')})"
-                    for m in clarification.get("matches", [])
-                )
-                prompt += f"\n<clarification_needed>\nYou heard about \"{clarification['name']}\" but there are multiple people with similar names: {matches_desc}. When natural, ask which one they mean.\n</clarification_needed>\n"
+            consolidator = get_consolidator()
+            self._maybe_consolidate()
         except Exception:
             pass
 
+        # The date is part of the key so fact confidence decay is still picked up daily
+        stable_key = (
+            prompt,
+            date.today(),
+            get_user_profile().version(),
+            get_conversation_store().version(),
+            consolidator.version() if consolidator else None,
+            get_relationship_graph().version(),
+        )
+        if stable_key != self._stable_prompt_key:
+            self._stable_prompt = self._build_stable_context(prompt)
+            self._stable_prompt_key = stable_key
+            self._ctx_pool.submit(self._count_stable_tokens, self._stable_prompt)
+        return self._stable_prompt
+
+    def _build_volatile_suffix(self) -> str:
+        """The per-turn part of the system prompt: time, home state, and anything pending."""
+        # Earlier turns of this conversation that were trimmed from history
+        volatile = []
+        if self._rolling_summary:
+            volatile.append(f"\n<earlier_conversation>\n{self._rolling_summary}\n</earlier_conversation>\n")
+
+        # Add current time
+        now = datetime.now()
+        time_str = now.strftime("%A, %B %d, %Y at %I:%M %p")
+        volatile.append(f"\n<current_time>\n{time_str}\n</current_time>\n")
+
+        def clarification():
+            return get_relationship_graph().get_pending_clarification()
+
+        providers = {
+            "clarification": clarification,
+            "lights": self._lights_context,
+            "gaps": self._gap_context,
+        }
+        if self._home_context:
+            providers["home"] = self._home_context
+        ctx = self._gather_context(providers, timeout=self.context_timeout)
+
+        # Add pending clarifications about people
+        pending = ctx.get("clarification")
+        if pending:
+            matches_desc = ", ".join(
+                f"{m['name']} ({m.get('relationship_type', 'unknown')})"
+                for m in pending.get("matches", [])
+            )
+            volatile.append(f"\n<clarification_needed>\nYou heard about \"{pending['name']}\" but there are multiple people with similar names: {matches_desc}. When natural, ask which one they mean.\n</clarification_needed>\n")
+
         # Add home context
-        if self.home_context_provider:
-            try:
-                home_context = self.home_context_provider()
-                prompt += f"\n<current_home_state>\n{home_context}\n</current_home_state>\n"
-            except Exception:
-                pass
+        if "home" in ctx:
+            volatile.append(f"\n<current_home_state>\n{ctx['home']}\n</current_home_state>\n")
 
         # Add current light state
-        try:
-            light_state = self.light_controller.get_detailed_status()
-            prompt += f"\n<current_lights>\n{light_state}\n</current_lights>\n"
-        except Exception:
-            pass
+        if "lights" in ctx:
+            volatile.append(f"\n<current_lights>\n{ctx['lights']}\n</current_lights>\n")
 
         # Knowledge gaps
-        gap_prompt = get_knowledge_gap_context()
+        gap_prompt = ctx.get("gaps")
         if gap_prompt:
-            prompt += f"\n<curiosity>\n{gap_prompt}\n</curiosity>\n"
+            volatile.append(f"\n<curiosity>\n{gap_prompt}\n</curiosity>\n")
+
+        return "".join(volatile)
 
-        return prompt
+    def _build_system_prompt(self) -> List[Dict]:
+        """
+        Build full system prompt with context.
+
+        Returned as two text blocks: the static prefix first (marked for prompt
+        caching), then the volatile suffix that changes turn to turn. Keeping
+        the volatile parts last means they never invalidate the cached prefix.
+        """
+        blocks = []
+        prefix = self._build_static_prefix()
+        if prefix:
+            blocks.append({"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}})
+        blocks.append({"type": "text", "text": self._build_volatile_suffix()})
+        return blocks
 
     def save_conversation(self):
-        """Save current conversation to memory."""
+        """Queue the current conversation to be saved to memory in the background."""
         if len(self.conversation_history) >= 2:
-            store = get_conversation_store()
-            store.store_conversation(self.conversation_history)
+            # Shallow copy - the history list is reset right after this
+            self._save_queue.put(list(self.conversation_history))
             return True
         return False
 
+    def _save_worker(self):
+        """Drain the save queue, storing each conversation. None stops the worker."""
+        while True:
+            payload = self._save_queue.get()
+            if payload is None:
+                return
+            try:
+                get_conversation_store().store_conversation(payload)
+            except Exception as e:
+                log.error("[Alfred] Failed to save conversation: %s", e)
+
+    def close(self, timeout: float = 30.0):
+        """Finish pending conversation saves. Call on shutdown; safe to call twice."""
+        if self._closed:
+            return
+        self._closed = True
+        self._cancel_idle_timer()
+        self._ctx_pool.shutdown(wait=False)
+        self._save_queue.put(None)
+        self._save_thread.join(timeout)
+        get_conversation_store().close()
+
     def check_conversation_timeout(self):
         """Check if conversation timed out and save if so."""
-        if not self.conversation_history:
-            return
-        if self.last_interaction_time == 0:
+        if not self.conversation_history or self.last_interaction_time == 0:
             return
 
-        idle_time = time.time() - self.last_interaction_time
+        idle_time = time.monotonic() - self.last_interaction_time
         if idle_time > self.conversation_timeout:
-            print(f"[Alfred] Conversation idle for {idle_time:.0f}s, saving...")
+            log.info("[Alfred] Conversation idle for %.0fs, saving...", idle_time)
             if self.save_conversation():
-                self.conversation_history = []
+                self._reset_history()
                 self.last_interaction_time = 0
 
     def clear_history(self):
         """Save and clear conversation history."""
+        self._cancel_idle_timer()
         self.save_conversation()
-        self.conversation_history = []
-        print("[Alfred] Conversation history cleared")
+        self._reset_history()
+        log.info("[Alfred] Conversation history cleared")
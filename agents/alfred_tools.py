@@ -0,0 +1,157 @@
+"""
+Tool definitions for Alfred - the schemas Claude sees for controlling the home.
+"""
+
+# Tool definitions - these are what Alfred can do
+ALFRED_TOOLS = [
+    {
+        "name": "control_lights",
+        "description": "Control the home's smart lights. Can turn on/off, set brightness, change color, or adjust warmth.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["on", "off", "brightness", "color", "warmth"],
+                    "description": "What to do with the lights"
+                },
+                "target": {
+                    "type": "string",
+                    "description": "Which lights: 'living room', 'kitchen', 'hallway', or 'all'"
+                },
+                "value": {
+                    "type": "string",
+                    "description": "For brightness: 0-100. For color: red/blue/green/etc. For warmth: warm/cool/neutral"
+                }
+            },
+            "required": ["action", "target"]
+        }
+    },
+    {
+        "name": "get_light_status",
+        "description": "Check the current state of all lights - whether on/off, brightness level, and color",
+        "input_schema": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    },
+    {
+        "name": "get_home_status",
+        "description": "Get overall home status including door activity patterns and current light states",
+        "input_schema": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    },
+    {
+        "name": "control_music",
+        "description": "Control music playback - play, pause, skip, volume, search for songs/artists/playlists",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["play", "pause", "toggle", "next", "previous", "volume", "search", "playlist", "shuffle"],
+                    "description": "What to do: play/pause/toggle playback, next/previous track, set volume, search for music, play a playlist, or toggle shuffle"
+                },
+                "query": {
+                    "type": "string",
+                    "description": "For search: song/artist/album name. For playlist: playlist name. For volume: 'up', 'down', or 0-100"
+                },
+                "app": {
+                    "type": "string",
+                    "enum": ["Music", "Spotify"],
+                    "description": "Which app to use (default: Apple Music)"
+                }
+            },
+            "required": ["action"]
+        }
+    },
+    {
+        "name": "get_music_status",
+        "description": "Get what's currently playing, player state, and volume level",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "app": {
+                    "type": "string",
+                    "enum": ["Music", "Spotify"],
+                    "description": "Which app to check (default: Apple Music)"
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "control_audio_output",
+        "description": "Switch system audio output to a different speaker. Music uses External Headphones (Audioengine via AUX), Alfred's voice uses Yealink SP92.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["switch", "list", "current"],
+                    "description": "switch to a device, list available devices, or get current device"
+                },
+                "device": {
+                    "type": "string",
+                    "enum": ["External Headphones", "Yealink SP92", "Mac mini Speakers"],
+                    "description": "Device to switch to (for switch action)"
+                }
+            },
+            "required": ["action"]
+        }
+    },
+    {
+        "name": "eucalyptus",
+        "description": "Control the eucalyptus scent diffuser. Fresh, clean scent - energizing and clarifying. Good for focus and clear thinking.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["on", "off", "status"],
+                    "description": "Turn the eucalyptus diffuser on, off, or check its status"
+                }
+            },
+            "required": ["action"]
+        }
+    },
+    {
+        "name": "orange",
+        "description": "Control the orange scent diffuser. Warm, citrus scent - uplifting and cheerful. Good for mood and welcoming guests.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["on", "off", "status"],
+                    "description": "Turn the orange diffuser on, off, or check its status"
+                }
+            },
+            "required": ["action"]
+        }
+    },
+    {
+        "name": "coffee",
+        "description": "Control the coffee maker. Turning it on starts brewing. The coffee maker is connected via smart plug.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["brew", "off", "status"],
+                    "description": "Start brewing coffee, turn off the coffee maker, or check its status"
+                }
+            },
+            "required": ["action"]
+        }
+    }
+]
+
+# Cache breakpoint after the last tool: the schemas are the first thing in
+# every request, so they're billed at the cached rate even when the system
+# prompt's own cached block is rebuilt
+ALFRED_TOOLS[-1]["cache_control"] = {"type": "ephemeral"}
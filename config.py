@@ -17,9 +17,18 @@ class Config:
 
     # Anthropic
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
+    # Set to "optimized" to request latency-optimized inference where the
+    # endpoint supports it (e.g. Bedrock). Empty = standard latency.
+    ANTHROPIC_LATENCY_MODE: str = os.getenv("ANTHROPIC_LATENCY_MODE", "")
+    # Summarize finished conversations via the Message Batches API (half the
+    # cost, but summaries can take minutes to hours to land in memory)
+    ANTHROPIC_BATCH_SUMMARIES: bool = os.getenv("ANTHROPIC_BATCH_SUMMARIES", "").lower() in ("1", "true", "yes")
 
     # OpenAI (for Whisper STT)
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    # Reuse the summary of a near-identical past conversation instead of
+    # asking Claude again (costs an OpenAI embedding call per summary)
+    SUMMARY_CACHE: bool = os.getenv("SUMMARY_CACHE", "").lower() in ("1", "true", "yes")
 
     # ElevenLabs
     ELEVENLABS_API_KEY: str = os.getenv("ELEVENLABS_API_KEY", "")
@@ -29,6 +38,9 @@ class Config:
     OPENWEATHER_API_KEY: str = os.getenv("OPENWEATHER_API_KEY", "")
     OPENWEATHER_CITY: str = os.getenv("OPENWEATHER_CITY", "San Francisco")
 
+    # Logging level for the "reality" loggers (DEBUG shows Alfred's replies)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+
     # Presence tracking
     MIN_ABSENCE_SECONDS: int = 0  # TESTING: greet every time (normally 300 = 5 minutes)
 
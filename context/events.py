@@ -0,0 +1,75 @@
+"""
+Door event log - door event history stored column-wise.
+The fields pattern detection needs are derived once when an event is
+recorded, so analysis runs over ready-made integer arrays.
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Iterable, Iterator
+
+
+TIME_BUCKET_MINUTES = 30       # Group events into 30-min buckets
+BUCKETS_PER_HOUR = 60 // TIME_BUCKET_MINUTES
+
+# Hard cap on stored events, whatever the retention window
+MAX_EVENTS = 10_000
+
+
+class DoorEventLog:
+    """
+    Door events as parallel arrays (one entry per event, oldest first):
+    unix timestamps plus the local hour, minute, weekday and time bucket.
+    """
+
+    def __init__(self, events: Iterable[datetime] = (), max_events: int = MAX_EVENTS):
+        self.max_events = max_events
+        self.timestamps = array("q")   # Unix seconds
+        self.hours = array("b")        # 0-23
+        self.minutes = array("b")      # 0-59
+        self.weekdays = array("b")     # 0 = Monday
+        self.buckets = array("h")      # hour * BUCKETS_PER_HOUR + minute bucket
+        for event in events:
+            self.append(event)
+
+    def append(self, dt: datetime):
+        """Record an event. Events are expected in chronological order."""
+        self._append(int(dt.timestamp()), dt)
+
+    def append_timestamp(self, ts: int):
+        """Record an event given as unix seconds."""
+        self._append(ts, datetime.fromtimestamp(ts))
+
+    def _append(self, ts: int, dt: datetime):
+        self.timestamps.append(ts)
+        self.hours.append(dt.hour)
+        self.minutes.append(dt.minute)
+        self.weekdays.append(dt.weekday())
+        self.buckets.append(dt.hour * BUCKETS_PER_HOUR + dt.minute // TIME_BUCKET_MINUTES)
+        if len(self.timestamps) > self.max_events:
+            self._drop_first(len(self.timestamps) - self.max_events)
+
+    def _drop_first(self, n: int):
+        for column in (self.timestamps, self.hours, self.minutes, self.weekdays, self.buckets):
+            del column[:n]
+
+    def drop_before(self, cutoff: datetime) -> int:
+        """Drop events older than cutoff. Returns how many were dropped."""
+        cutoff_ts = int(cutoff.timestamp())
+        # Common case: the oldest event is still in the window
+        if not self.timestamps or self.timestamps[0] >= cutoff_ts:
+            return 0
+        n = bisect_left(self.timestamps, cutoff_ts)
+        self._drop_first(n)
+        return n
+
+    def count_since(self, start: datetime) -> int:
+        """Number of events at or after start."""
+        return len(self.timestamps) - bisect_left(self.timestamps, int(start.timestamp()))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[datetime]:
+        return (datetime.fromtimestamp(ts) for ts in self.timestamps)
@@ -3,12 +3,47 @@ Context gatherer.
 Assembles all available context for greeting generation.
 """
 
+import time
 from datetime import datetime
+from typing import Optional, Tuple
 
 from context.presence import PresenceTracker
 from context.weather import WeatherContext
 
 
+def _time_of_day(hour: int) -> str:
+    if hour < 6:
+        return "late night"
+    elif hour < 12:
+        return "morning"
+    elif hour < 17:
+        return "afternoon"
+    elif hour < 21:
+        return "evening"
+    return "night"
+
+
+# Time-of-day label for each hour, 0-23
+_HOUR_TO_TOD = tuple(_time_of_day(h) for h in range(24))
+
+# Indexed by datetime.weekday() - avoids a locale-aware strftime("%A")
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# (monotonic time it was read, wall-clock datetime)
+_now_cache: Tuple[float, Optional[datetime]] = (0.0, None)
+
+
+def _now_cached(ttl: float = 0.25) -> datetime:
+    """datetime.now(), reused for events that arrive in a quick burst."""
+    global _now_cache
+    read_at, now = _now_cache
+    mono = time.monotonic()
+    if now is None or mono - read_at > ttl:
+        now = datetime.now()
+        _now_cache = (mono, now)
+    return now
+
+
 class ContextGatherer:
     """Gathers all context needed for Alfred's greeting."""
 
@@ -21,7 +56,7 @@ class ContextGatherer:
         Gather all context for a door event.
         Returns raw data - let Claude decide what it means.
         """
-        now = datetime.now()
+        now = _now_cached()
 
         # Record this door event and get timing
         event_info = self.presence.record_door_event()
@@ -29,20 +64,12 @@ class ContextGatherer:
 
         # Time context
         hour = now.hour
-        if hour < 6:
-            time_of_day = "late night"
-        elif hour < 12:
-            time_of_day = "morning"
-        elif hour < 17:
-            time_of_day = "afternoon"
-        elif hour < 21:
-            time_of_day = "evening"
-        else:
-            time_of_day = "night"
+        time_of_day = _HOUR_TO_TOD[hour]
 
         # Day context
-        day_name = now.strftime("%A")
-        is_weekend = now.weekday() >= 5
+        weekday = now.weekday()
+        day_name = _DAY_NAMES[weekday]
+        is_weekend = weekday >= 5
 
         # Time description
         time_description = self.presence.get_time_description(seconds_since_last)
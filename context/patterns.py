@@ -3,19 +3,28 @@ Pattern detection - analyzes door events to detect behavioral patterns.
 Promotes strong patterns to routines in the user profile.
 """
 
-import json
-from collections import defaultdict
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, Union
 
+import numpy as np
+import orjson
+
+from context.events import DoorEventLog, TIME_BUCKET_MINUTES, BUCKETS_PER_HOUR
 from memory.user_profile import get_user_profile
 
 
 # Pattern detection constants
 MIN_OBSERVATIONS = 5           # Need at least this many to establish pattern
 CONFIDENCE_THRESHOLD = 0.6     # Confidence needed to promote to routine
-TIME_BUCKET_MINUTES = 30       # Group events into 30-min buckets
+CONTEXT_CONFIDENCE = 0.5       # Confidence needed to mention a pattern in context
+PATTERN_RETENTION_DAYS = 30    # Forget weak patterns not seen for this long
+
+# "HH:MM" label for each time bucket, indexed by hour * BUCKETS_PER_HOUR + bucket
+_BUCKET_LABELS = tuple(
+    f"{h:02d}:{m:02d}" for h in range(24) for m in range(0, 60, TIME_BUCKET_MINUTES)
+)
 
 
 class PatternDetector:
@@ -33,8 +42,7 @@ class PatternDetector:
         """Load patterns from disk."""
         if self.patterns_file.exists():
             try:
-                with open(self.patterns_file, "r") as f:
-                    self._data = json.load(f)
+                self._data = orjson.loads(self.patterns_file.read_bytes())
             except Exception as e:
                 print(f"[PatternDetector] Error loading: {e}")
                 self._data = self._default_data()
@@ -42,6 +50,16 @@ class PatternDetector:
             self._data = self._default_data()
             self._save()
 
+        # (type, time_bucket) -> pattern, for constant-time lookups
+        self._index: Dict[Tuple[str, Optional[str]], Dict] = {}
+        for p in self._data["door_patterns"]:
+            self._index.setdefault((p["type"], p.get("time_bucket")), p)
+
+        # Promotion is one-way, so only these ever need checking again
+        self._unpromoted: List[Dict] = [
+            p for p in self._data["door_patterns"] if not p.get("promoted")
+        ]
+
     def _default_data(self) -> dict:
         """Return empty patterns structure."""
         return {
@@ -51,127 +69,125 @@ class PatternDetector:
         }
 
     def _save(self):
-        """Persist patterns to disk."""
-        with open(self.patterns_file, "w") as f:
-            json.dump(self._data, f, indent=2)
+        """Persist patterns to disk atomically, as compact JSON."""
+        tmp = self.patterns_file.with_suffix(".tmp")
+        tmp.write_bytes(orjson.dumps(self._data, option=orjson.OPT_SERIALIZE_NUMPY))
+        os.replace(tmp, self.patterns_file)
 
     def _time_bucket(self, dt: datetime) -> str:
         """Convert time to 30-minute bucket string."""
-        bucket_minute = (dt.minute // TIME_BUCKET_MINUTES) * TIME_BUCKET_MINUTES
-        return f"{dt.hour:02d}:{bucket_minute:02d}"
+        return _BUCKET_LABELS[dt.hour * BUCKETS_PER_HOUR + dt.minute // TIME_BUCKET_MINUTES]
+
+    def _bucket_label(self, idx: int) -> str:
+        """Bucket string for a bucket index (hour * buckets-per-hour + bucket)."""
+        return _BUCKET_LABELS[idx]
 
     def _day_type(self, dt: datetime) -> str:
         """Return 'weekday' or 'weekend'."""
         return "weekend" if dt.weekday() >= 5 else "weekday"
 
-    def analyze_door_events(self, events: List[datetime]) -> List[Dict]:
+    def analyze_door_events(self, events: Union[DoorEventLog, List[datetime]]) -> List[Dict]:
         """
         Analyze door events to find patterns.
 
         Args:
-            events: List of datetime objects for door events
+            events: Door event log (or a list of datetime objects)
 
         Returns:
             List of detected patterns
         """
         if len(events) < MIN_OBSERVATIONS:
             return []
-
-        # Group events by day type and time bucket
-        weekday_buckets = defaultdict(list)
-        weekend_buckets = defaultdict(list)
-
-        for event in events:
-            bucket = self._time_bucket(event)
-            day_type = self._day_type(event)
-
-            if day_type == "weekday":
-                weekday_buckets[bucket].append(event)
-            else:
-                weekend_buckets[bucket].append(event)
+        if not isinstance(events, DoorEventLog):
+            events = DoorEventLog(events)
+
+        # Zero-copy views of the log's precomputed columns
+        stamps = np.frombuffer(events.timestamps, dtype=np.int64)
+        hours = np.frombuffer(events.hours, dtype=np.int8)
+        minutes = np.frombuffer(events.minutes, dtype=np.int8)
+        is_weekday = np.frombuffer(events.weekdays, dtype=np.int8) < 5
+        bucket_idx = np.frombuffer(events.buckets, dtype=np.int16)
+
+        def observed(first, last) -> Dict:
+            """First/last observed times from the smallest/largest of some timestamp cells."""
+            return {
+                "first_observed": datetime.fromtimestamp(int(first.min())).isoformat(),
+                "last_observed": datetime.fromtimestamp(int(last.max())).isoformat(),
+            }
+
+        # One fused pass: row 0 = weekday buckets, row 1 = weekend buckets.
+        # Counts and first/last timestamps per cell; every pattern below is
+        # read off these tables. Events needn't be sorted.
+        n_buckets = 24 * BUCKETS_PER_HOUR
+        day_row = (~is_weekday).astype(np.intp)
+        cell = day_row * n_buckets + bucket_idx
+        histogram = np.bincount(cell, minlength=2 * n_buckets).reshape(2, n_buckets)
+        first = np.full(2 * n_buckets, np.iinfo(np.int64).max)
+        last = np.full(2 * n_buckets, np.iinfo(np.int64).min)
+        np.minimum.at(first, cell, stamps)
+        np.maximum.at(last, cell, stamps)
+        first = first.reshape(2, n_buckets)
+        last = last.reshape(2, n_buckets)
 
         patterns = []
 
-        # Find weekday patterns
-        for bucket, bucket_events in weekday_buckets.items():
-            if len(bucket_events) >= MIN_OBSERVATIONS:
-                confidence = min(len(bucket_events) / 10, 1.0)  # Max confidence at 10 observations
+        # Find weekday and weekend patterns by time bucket
+        for row, pattern_type, label in (
+            (0, "weekday_activity", "weekdays"),
+            (1, "weekend_activity", "weekends"),
+        ):
+            counts = histogram[row]
+            for idx in np.flatnonzero(counts >= MIN_OBSERVATIONS):
+                count = int(counts[idx])
+                bucket = self._bucket_label(int(idx))
                 patterns.append({
-                    "type": "weekday_activity",
+                    "type": pattern_type,
                     "time_bucket": bucket,
-                    "observations": len(bucket_events),
-                    "confidence": confidence,
-                    "description": f"Activity around {bucket} on weekdays",
-                    "first_observed": min(bucket_events).isoformat(),
-                    "last_observed": max(bucket_events).isoformat(),
+                    "observations": count,
+                    "confidence": min(count / 10, 1.0),  # Max confidence at 10 observations
+                    "description": f"Activity around {bucket} on {label}",
+                    **observed(first[row, idx], last[row, idx]),
                 })
 
-        # Find weekend patterns
-        for bucket, bucket_events in weekend_buckets.items():
-            if len(bucket_events) >= MIN_OBSERVATIONS:
-                confidence = min(len(bucket_events) / 10, 1.0)
+        # Detect morning departure (7-10am weekdays) and evening arrival (5-8pm weekdays)
+        fractional_hours = None
+        for lo, hi, pattern_type, template in (
+            (7, 10, "morning_departure", "Typically leaves around {} on weekday mornings"),
+            (17, 20, "evening_arrival", "Typically arrives around {} on weekday evenings"),
+        ):
+            cols = slice(lo * BUCKETS_PER_HOUR, (hi + 1) * BUCKETS_PER_HOUR)
+            count = int(histogram[0, cols].sum())
+            if count >= MIN_OBSERVATIONS:
+                if fractional_hours is None:
+                    fractional_hours = hours + minutes / 60
+                mask = is_weekday & (hours >= lo) & (hours <= hi)
+                avg_hour = float(fractional_hours[mask].mean())
+                avg_time = f"{int(avg_hour):02d}:{int((avg_hour % 1) * 60):02d}"
                 patterns.append({
-                    "type": "weekend_activity",
-                    "time_bucket": bucket,
-                    "observations": len(bucket_events),
-                    "confidence": confidence,
-                    "description": f"Activity around {bucket} on weekends",
-                    "first_observed": min(bucket_events).isoformat(),
-                    "last_observed": max(bucket_events).isoformat(),
+                    "type": pattern_type,
+                    "time_bucket": avg_time,
+                    "observations": count,
+                    "confidence": min(count / 10, 1.0),
+                    "description": template.format(avg_time),
+                    **observed(first[0, cols], last[0, cols]),
                 })
 
-        # Detect morning departure pattern (7-10am weekdays)
-        morning_events = [
-            e for e in events
-            if self._day_type(e) == "weekday" and 7 <= e.hour <= 10
-        ]
-        if len(morning_events) >= MIN_OBSERVATIONS:
-            avg_hour = sum(e.hour + e.minute / 60 for e in morning_events) / len(morning_events)
-            avg_time = f"{int(avg_hour):02d}:{int((avg_hour % 1) * 60):02d}"
-            patterns.append({
-                "type": "morning_departure",
-                "time_bucket": avg_time,
-                "observations": len(morning_events),
-                "confidence": min(len(morning_events) / 10, 1.0),
-                "description": f"Typically leaves around {avg_time} on weekday mornings",
-                "first_observed": min(morning_events).isoformat(),
-                "last_observed": max(morning_events).isoformat(),
-            })
-
-        # Detect evening arrival pattern (5-8pm weekdays)
-        evening_events = [
-            e for e in events
-            if self._day_type(e) == "weekday" and 17 <= e.hour <= 20
-        ]
-        if len(evening_events) >= MIN_OBSERVATIONS:
-            avg_hour = sum(e.hour + e.minute / 60 for e in evening_events) / len(evening_events)
-            avg_time = f"{int(avg_hour):02d}:{int((avg_hour % 1) * 60):02d}"
-            patterns.append({
-                "type": "evening_arrival",
-                "time_bucket": avg_time,
-                "observations": len(evening_events),
-                "confidence": min(len(evening_events) / 10, 1.0),
-                "description": f"Typically arrives around {avg_time} on weekday evenings",
-                "first_observed": min(evening_events).isoformat(),
-                "last_observed": max(evening_events).isoformat(),
-            })
-
         # Detect night owl pattern (activity after 11pm)
-        late_night_events = [e for e in events if e.hour >= 23 or e.hour < 4]
-        if len(late_night_events) >= MIN_OBSERVATIONS:
+        late_night = np.r_[23 * BUCKETS_PER_HOUR:n_buckets, 0:4 * BUCKETS_PER_HOUR]
+        count = int(histogram[:, late_night].sum())
+        if count >= MIN_OBSERVATIONS:
             patterns.append({
                 "type": "night_owl",
                 "time_bucket": "late",
-                "observations": len(late_night_events),
-                "confidence": min(len(late_night_events) / 10, 1.0),
+                "observations": count,
+                "confidence": min(count / 10, 1.0),
                 "description": "Often active late at night",
-                "first_observed": min(late_night_events).isoformat(),
-                "last_observed": max(late_night_events).isoformat(),
+                **observed(first[:, late_night], last[:, late_night]),
             })
 
         return patterns
 
-    def update_patterns(self, events: List[datetime]):
+    def update_patterns(self, events: Union[DoorEventLog, List[datetime]]):
         """
         Analyze events and update stored patterns.
         Promotes high-confidence patterns to user profile routines.
@@ -189,17 +205,25 @@ class PatternDetector:
             else:
                 # Add new pattern
                 self._data["door_patterns"].append(new_p)
+                self._index[(new_p["type"], new_p.get("time_bucket"))] = new_p
+                self._unpromoted.append(new_p)
 
         self._data["last_analysis"] = datetime.now().isoformat()
-        self._save()
 
         # Promote high-confidence patterns to routines
         self._promote_patterns()
 
+        self._prune_patterns()
+        self._save()
+
         return new_patterns
 
     def _find_pattern(self, pattern_type: str, time_bucket: str = None) -> Optional[Dict]:
         """Find an existing pattern by type and time bucket."""
+        if time_bucket is not None:
+            return self._index.get((pattern_type, time_bucket))
+
+        # Any bucket of this type
         for p in self._data["door_patterns"]:
             if p["type"] == pattern_type:
                 if time_bucket is None or p.get("time_bucket") == time_bucket:
@@ -207,13 +231,13 @@ class PatternDetector:
         return None
 
     def _promote_patterns(self):
-        """Promote high-confidence patterns to user profile routines."""
+        """Promote high-confidence patterns to user profile routines. Caller saves."""
+        if not self._unpromoted:
+            return
         profile = get_user_profile()
 
-        for pattern in self._data["door_patterns"]:
-            if pattern.get("promoted"):
-                continue
-
+        still_unpromoted = []
+        for pattern in self._unpromoted:
             if (pattern["confidence"] >= CONFIDENCE_THRESHOLD and
                     pattern["observations"] >= MIN_OBSERVATIONS):
 
@@ -230,8 +254,31 @@ class PatternDetector:
                 pattern["promoted"] = True
                 pattern["promoted_date"] = datetime.now().isoformat()
                 print(f"[PatternDetector] Promoted to routine: {pattern['description']}")
+            else:
+                still_unpromoted.append(pattern)
 
-        self._save()
+        self._unpromoted = still_unpromoted
+
+    def _prune_patterns(self):
+        """
+        Forget weak patterns that haven't been seen recently.
+        Promoted and confident patterns are always kept.
+        """
+        cutoff = (datetime.now() - timedelta(days=PATTERN_RETENTION_DAYS)).isoformat()
+        patterns = self._data["door_patterns"]
+        kept = [
+            p for p in patterns
+            if p.get("promoted")
+            or p["confidence"] >= CONTEXT_CONFIDENCE
+            or p.get("last_observed", "") > cutoff
+        ]
+        if len(kept) == len(patterns):
+            return
+
+        self._data["door_patterns"] = kept
+        kept_ids = {id(p) for p in kept}
+        self._index = {k: p for k, p in self._index.items() if id(p) in kept_ids}
+        self._unpromoted = [p for p in self._unpromoted if id(p) in kept_ids]
 
     def get_patterns(self) -> List[Dict]:
         """Get all detected patterns."""
@@ -239,7 +286,7 @@ class PatternDetector:
 
     def get_context(self) -> Optional[str]:
         """Format patterns as context for prompts."""
-        patterns = [p for p in self._data["door_patterns"] if p["confidence"] >= 0.5]
+        patterns = [p for p in self._data["door_patterns"] if p["confidence"] >= CONTEXT_CONFIDENCE]
         if not patterns:
             return None
 
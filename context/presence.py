@@ -4,17 +4,49 @@ Just tracks when the door was last opened - no guessing about enter/exit.
 Feeds events to pattern detector for routine learning.
 """
 
-import json
-from datetime import datetime, timedelta
+import os
+import time
+from datetime import datetime, timedelta, time as dtime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List
 
-from context.patterns import get_pattern_detector
+import orjson
+
+from context.events import DoorEventLog
 
 
 # How much history to keep for pattern analysis
 HISTORY_RETENTION_DAYS = 30
 
+# Compact the append-only event log once it grows past this many bytes
+EVENT_LOG_COMPACT_BYTES = 256 * 1024
+
+# Re-run pattern analysis after this many new events, or this long (seconds)
+ANALYSIS_EVENT_THRESHOLD = 10
+ANALYSIS_INTERVAL = 3600
+
+
+@lru_cache(maxsize=256)
+def _describe_seconds(seconds: int) -> str:
+    """Natural-language duration, at whole-second resolution."""
+    minutes = seconds / 60
+    hours = minutes / 60
+
+    if seconds < 30:
+        return f"{seconds} seconds"
+    elif minutes < 2:
+        return f"about {int(minutes)} minute"
+    elif minutes < 60:
+        return f"about {int(minutes)} minutes"
+    elif hours < 2:
+        return f"about {hours:.1f} hours"
+    elif hours < 24:
+        return f"about {int(hours)} hours"
+    else:
+        days = hours / 24
+        return f"about {days:.1f} days"
+
 
 class PresenceTracker:
     """
@@ -23,44 +55,90 @@ class PresenceTracker:
     Maintains history for pattern awareness.
     """
 
-    def __init__(self, state_file: str = "door_state.json"):
+    def __init__(self, state_file: str = "door_state.json", events_file: str = "door_events.jsonl"):
         self.state_file = Path(__file__).parent.parent / "data" / state_file
+        self.events_file = self.state_file.parent / events_file
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
         self._load_state()
+        # Events recorded since pattern analysis last ran, and when it ran (monotonic)
+        self._events_since_analysis = 0
+        self._last_analyzed_time: Optional[float] = None
 
     def _load_state(self):
-        """Load state from disk."""
+        """
+        Load state from disk: the last event from the state file, history
+        from the append-only event log (one unix timestamp per line).
+        """
+        self.last_door_event = None
+        legacy_history = None
         if self.state_file.exists():
-            with open(self.state_file, "r") as f:
-                data = json.load(f)
-                self.last_door_event = (
-                    datetime.fromisoformat(data["last_door_event"])
-                    if data.get("last_door_event")
-                    else None
-                )
-                # Load event history (list of ISO timestamps)
-                self.event_history = [
-                    datetime.fromisoformat(ts)
-                    for ts in data.get("event_history", [])
-                ]
-        else:
-            self.last_door_event = None
-            self.event_history = []
+            data = orjson.loads(self.state_file.read_bytes())
+            self.last_door_event = (
+                datetime.fromisoformat(data["last_door_event"])
+                if data.get("last_door_event")
+                else None
+            )
+            # Older state files embedded the whole history
+            legacy_history = data.get("event_history")
+
+        migrate = legacy_history is not None and not self.events_file.exists()
+        self.event_history = DoorEventLog()
+        if migrate:
+            self._load_history(legacy_history)
+            self._rewrite_event_log()
+            self._write_state_file()
+        elif self.events_file.exists():
+            with open(self.events_file, "r") as f:
+                self._load_history(f)
+
+    def _load_history(self, entries):
+        """Append the in-window entries (event log lines or legacy ISO strings)."""
+        cutoff_ts = (datetime.now() - timedelta(days=HISTORY_RETENTION_DAYS)).timestamp()
+        for entry in entries:
+            ts = self._parse_timestamp(entry)
+            if ts is not None and ts > cutoff_ts:
+                self.event_history.append_timestamp(ts)
+
+    @staticmethod
+    def _parse_timestamp(entry: str) -> Optional[int]:
+        """
+        Unix seconds from a log line. Older files stored ISO strings
+        (JSON-quoted in the event log). Returns None for blank or torn lines.
+        """
+        try:
+            return int(entry)
+        except ValueError:
+            pass
+        try:
+            return int(datetime.fromisoformat(entry.strip().strip('"')).timestamp())
+        except ValueError:
+            return None
+
+    def _write_state_file(self):
+        """Write the small state file (just the last event)."""
+        data = {"last_door_event": self.last_door_event}
+        self.state_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+    def _rewrite_event_log(self):
+        """Atomically rewrite the event log with just the in-memory (in-window) history."""
+        tmp = self.events_file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.writelines(f"{ts}\n" for ts in self.event_history.timestamps)
+        os.replace(tmp, self.events_file)
+
+    def _save_state(self, event: datetime):
+        """Persist a new event: append it to the log and update the state file."""
+        with open(self.events_file, "a") as f:
+            f.write(f"{int(event.timestamp())}\n")
+        self._write_state_file()
 
-    def _save_state(self):
-        """Persist state to disk."""
         # Keep history for pattern analysis
         cutoff = datetime.now() - timedelta(days=HISTORY_RETENTION_DAYS)
-        self.event_history = [e for e in self.event_history if e > cutoff]
+        self.event_history.drop_before(cutoff)
 
-        data = {
-            "last_door_event": (
-                self.last_door_event.isoformat() if self.last_door_event else None
-            ),
-            "event_history": [e.isoformat() for e in self.event_history],
-        }
-        with open(self.state_file, "w") as f:
-            json.dump(data, f, indent=2)
+        # Old lines are only dropped from disk once the log is worth compacting
+        if self.events_file.stat().st_size > EVENT_LOG_COMPACT_BYTES:
+            self._rewrite_event_log()
 
     def record_door_event(self) -> dict:
         """
@@ -79,7 +157,7 @@ class PresenceTracker:
         previous_event = self.last_door_event
         self.last_door_event = now
         self.event_history.append(now)
-        self._save_state()
+        self._save_state(now)
 
         # Analyze patterns (promotes strong patterns to user profile routines)
         self._analyze_patterns()
@@ -91,9 +169,23 @@ class PresenceTracker:
         }
 
     def _analyze_patterns(self):
-        """Feed events to pattern detector for routine learning."""
+        """
+        Feed events to pattern detector for routine learning.
+        Analysis covers the whole history, so it only re-runs once enough
+        new events have arrived or enough time has passed.
+        """
+        self._events_since_analysis += 1
+        if (self._last_analyzed_time is not None
+                and self._events_since_analysis < ANALYSIS_EVENT_THRESHOLD
+                and time.monotonic() - self._last_analyzed_time < ANALYSIS_INTERVAL):
+            return
+
         if len(self.event_history) >= 5:  # Minimum needed for pattern detection
+            self._events_since_analysis = 0
+            self._last_analyzed_time = time.monotonic()
             try:
+                # Imported here: pattern detection pulls in numpy and the user profile
+                from context.patterns import get_pattern_detector
                 detector = get_pattern_detector()
                 detector.update_patterns(self.event_history)
             except Exception as e:
@@ -101,33 +193,26 @@ class PresenceTracker:
 
     def get_today_count(self) -> int:
         """Count door events today."""
-        today = datetime.now().date()
-        return sum(1 for e in self.event_history if e.date() == today)
+        midnight = datetime.combine(datetime.now().date(), dtime.min)
+        return self.event_history.count_since(midnight)
 
     def get_week_summary(self) -> dict:
         """Get summary of door events over the past week."""
-        now = datetime.now()
-        today = now.date()
-
-        summary = {
-            "today": 0,
-            "yesterday": 0,
-            "this_week": 0,
-        }
-
-        for event in self.event_history:
-            event_date = event.date()
-            days_ago = (today - event_date).days
-
-            if days_ago == 0:
-                summary["today"] += 1
-            elif days_ago == 1:
-                summary["yesterday"] += 1
+        today = datetime.now().date()
 
-            if days_ago < 7:
-                summary["this_week"] += 1
+        # History is sorted, so each count is a binary search from a midnight
+        since_today = self.event_history.count_since(datetime.combine(today, dtime.min))
+        since_yesterday = self.event_history.count_since(
+            datetime.combine(today - timedelta(days=1), dtime.min)
+        )
 
-        return summary
+        return {
+            "today": since_today,
+            "yesterday": since_yesterday - since_today,
+            "this_week": self.event_history.count_since(
+                datetime.combine(today - timedelta(days=6), dtime.min)
+            ),
+        }
 
     def get_home_context(self) -> str:
         """
@@ -158,6 +243,7 @@ class PresenceTracker:
 
         # Include detected patterns
         try:
+            from context.patterns import get_pattern_detector
             detector = get_pattern_detector()
             pattern_context = detector.get_context()
             if pattern_context:
@@ -172,20 +258,4 @@ class PresenceTracker:
         """Convert seconds into natural language."""
         if seconds is None:
             return "unknown (first event)"
-
-        minutes = seconds / 60
-        hours = minutes / 60
-
-        if seconds < 30:
-            return f"{int(seconds)} seconds"
-        elif minutes < 2:
-            return f"about {int(minutes)} minute"
-        elif minutes < 60:
-            return f"about {int(minutes)} minutes"
-        elif hours < 2:
-            return f"about {hours:.1f} hours"
-        elif hours < 24:
-            return f"about {int(hours)} hours"
-        else:
-            days = hours / 24
-            return f"about {days:.1f} days"
+        return _describe_seconds(int(seconds))
@@ -3,27 +3,41 @@ Weather context.
 Fetches current weather for greetings.
 """
 
+import time
 import requests
 from typing import Optional
 
 from config import config
 
 
+# Shared session so repeat fetches reuse the kept-alive TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "reality-home/1.0"})
+
+
 class WeatherContext:
     """Fetches current weather from OpenWeather API."""
 
     BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+    CACHE_SECONDS = 600  # OpenWeather doesn't update faster than this
+
+    def __init__(self):
+        self._cached: Optional[dict] = None
+        self._cached_at: float = 0  # time.monotonic()
 
     def get_weather(self) -> Optional[dict]:
         """
-        Get current weather.
+        Get current weather. Cached for CACHE_SECONDS.
         Returns None if API key not configured or request fails.
         """
         if not config.OPENWEATHER_API_KEY:
             return None
 
+        if self._cached is not None and time.monotonic() - self._cached_at < self.CACHE_SECONDS:
+            return self._cached
+
         try:
-            response = requests.get(
+            response = _SESSION.get(
                 self.BASE_URL,
                 params={
                     "q": config.OPENWEATHER_CITY,
@@ -35,11 +49,13 @@ class WeatherContext:
             response.raise_for_status()
             data = response.json()
 
-            return {
+            self._cached = {
                 "temp_f": round(data["main"]["temp"]),
                 "condition": data["weather"][0]["main"].lower(),
                 "description": data["weather"][0]["description"],
             }
+            self._cached_at = time.monotonic()
+            return self._cached
 
         except Exception as e:
             print(f"[Weather] Failed to fetch weather: {e}")
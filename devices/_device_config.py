@@ -0,0 +1,25 @@
+"""
+Device configuration - config/devices.json, read once and shared by
+every device controller.
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+
+
+log = logging.getLogger("reality.devices")
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "devices.json")
+
+
+@lru_cache(maxsize=1)
+def load() -> dict:
+    """Load device configuration from config/devices.json (parsed once)."""
+    try:
+        with open(CONFIG_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        log.warning("[Devices] %s not found, using empty config", CONFIG_PATH)
+        return {}
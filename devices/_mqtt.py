@@ -0,0 +1,101 @@
+"""
+Shared MQTT connection for the device controllers.
+Lights, diffusers and the coffee maker all talk to the same Zigbee2MQTT
+broker, so they share one client (one socket, one network thread) and
+each registers handlers for just its own topics.
+"""
+
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from config import config
+
+
+log = logging.getLogger("reality.mqtt")
+
+# Every Zigbee2MQTT device topic starts with this
+TOPIC_PREFIX = "zigbee2mqtt/"
+
+# Zigbee2MQTT on/off commands, pre-serialized
+PAYLOAD_ON = b'{"state":"ON"}'
+PAYLOAD_OFF = b'{"state":"OFF"}'
+
+MessageHandler = Callable[[mqtt.Client, object, mqtt.MQTTMessage], None]
+
+_client: Optional[mqtt.Client] = None
+_lock = threading.Lock()
+_connected = threading.Event()
+
+# (topic, handler) pairs to (re)subscribe on every connect
+_subscriptions: List[Tuple[str, MessageHandler]] = []
+# Called with the client after every connect
+_connect_handlers: List[Callable[[mqtt.Client], None]] = []
+
+
+def _on_connect(client, userdata, flags, reason_code, properties=None):
+    """Called when connected to MQTT broker."""
+    log.info("[MQTT] Connected to MQTT broker")
+    with _lock:
+        subscriptions = list(_subscriptions)
+        handlers = list(_connect_handlers)
+    for topic, _ in subscriptions:
+        client.subscribe(topic)
+    _connected.set()
+    for handler in handlers:
+        try:
+            handler(client)
+        except Exception as e:
+            log.warning("[MQTT] Connect handler error: %s", e)
+
+
+def _on_disconnect(client, userdata, flags, reason_code, properties=None):
+    """Called when disconnected from MQTT broker."""
+    _connected.clear()
+
+
+def get_shared_client() -> Optional[mqtt.Client]:
+    """Get the shared MQTT client, connecting on first use. None if the broker is unreachable."""
+    global _client
+    with _lock:
+        if _client is None:
+            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+            client.on_connect = _on_connect
+            client.on_disconnect = _on_disconnect
+            for topic, handler in _subscriptions:
+                client.message_callback_add(topic, handler)
+            try:
+                client.connect(config.MQTT_BROKER, config.MQTT_PORT, 60)
+            except Exception as e:
+                log.warning("[MQTT] Failed to connect to MQTT: %s", e)
+                return None
+            client.loop_start()
+            _client = client
+        return _client
+
+
+def is_connected() -> bool:
+    """Whether the shared client currently has a broker session."""
+    return _connected.is_set()
+
+
+def subscribe(topic: str, handler: MessageHandler):
+    """Route messages on topic to handler. Survives reconnects."""
+    with _lock:
+        _subscriptions.append((topic, handler))
+    client = get_shared_client()
+    if client is None:
+        return
+    client.message_callback_add(topic, handler)
+    if is_connected():
+        client.subscribe(topic)
+
+
+def on_connect(handler: Callable[[mqtt.Client], None]):
+    """Run handler(client) after every connect, and now if already connected."""
+    with _lock:
+        _connect_handlers.append(handler)
+    if is_connected() and _client is not None:
+        handler(_client)
@@ -3,30 +3,26 @@ Coffee maker controller via Zigbee2MQTT.
 Controls a smart plug connected to the coffee maker.
 """
 
-import json
-import os
+import logging
 from typing import Optional
 
+import orjson
 import paho.mqtt.client as mqtt
 
-from config import config
+from devices import _mqtt
+from devices._device_config import load as load_device_config
 
 
-def _load_device_config():
-    """Load device configuration from config/devices.json."""
-    config_path = os.path.join(os.path.dirname(__file__), "..", "config", "devices.json")
-    try:
-        with open(config_path) as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"[Coffee] Warning: {config_path} not found, using empty config")
-        return {"coffee_maker": {"id": "", "name": "Coffee Maker"}}
-
+log = logging.getLogger("reality.coffee")
 
 # Load coffee maker configuration from config/devices.json
-_device_config = _load_device_config()
+_device_config = load_device_config()
 COFFEE_MAKER = _device_config.get("coffee_maker", {"id": "", "name": "Coffee Maker"})
 
+# MQTT topics for the coffee maker plug
+_STATE_TOPIC = _mqtt.TOPIC_PREFIX + COFFEE_MAKER["id"]
+_SET_TOPIC = f"{_STATE_TOPIC}/set"
+
 
 class CoffeeController:
     """
@@ -35,64 +31,44 @@ class CoffeeController:
     """
 
     def __init__(self):
-        self.client: Optional[mqtt.Client] = None
-        self._connected = False
         self._state = False
-        self._connect()
-
-    def _connect(self):
-        """Connect to MQTT broker."""
-        try:
-            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-            self.client.on_connect = self._on_connect
-            self.client.on_message = self._on_message
-            self.client.connect(config.MQTT_BROKER, config.MQTT_PORT, 60)
-            self.client.loop_start()
-        except Exception as e:
-            print(f"[Coffee] Failed to connect to MQTT: {e}")
-
-    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
-        """Called when connected to MQTT broker."""
-        self._connected = True
-        print(f"[Coffee] Connected to MQTT broker")
 
-        # Subscribe to state updates
-        topic = f"zigbee2mqtt/{COFFEE_MAKER['id']}"
-        client.subscribe(topic)
+        # Shared broker connection; subscribe to state updates
+        self.client: Optional[mqtt.Client] = _mqtt.get_shared_client()
+        _mqtt.subscribe(_STATE_TOPIC, self._on_message)
 
     def _on_message(self, client, userdata, msg):
         """Called when a message is received - track state updates."""
         try:
-            payload = json.loads(msg.payload.decode())
+            payload = orjson.loads(msg.payload)
             if COFFEE_MAKER['id'] in msg.topic:
                 self._state = payload.get("state", "OFF") == "ON"
         except Exception:
             pass
 
-    def _publish(self, payload: dict) -> bool:
+    def _publish(self, payload: bytes) -> bool:
         """Publish a command to the coffee maker plug."""
-        if not self.client or not self._connected:
-            print("[Coffee] Not connected to MQTT")
+        if not self.client or not _mqtt.is_connected():
+            log.warning("[Coffee] Not connected to MQTT")
             return False
 
-        topic = f"zigbee2mqtt/{COFFEE_MAKER['id']}/set"
         try:
-            self.client.publish(topic, json.dumps(payload))
+            self.client.publish(_SET_TOPIC, payload)
             return True
         except Exception as e:
-            print(f"[Coffee] Failed to publish: {e}")
+            log.warning("[Coffee] Failed to publish: %s", e)
             return False
 
     def brew(self) -> str:
         """Start brewing coffee."""
-        if self._publish({"state": "ON"}):
+        if self._publish(_mqtt.PAYLOAD_ON):
             self._state = True
             return "Coffee maker on. Brewing now, sir."
         return "Failed to start the coffee maker"
 
     def turn_off(self) -> str:
         """Turn off the coffee maker."""
-        if self._publish({"state": "OFF"}):
+        if self._publish(_mqtt.PAYLOAD_OFF):
             self._state = False
             return "Coffee maker off"
         return "Failed to turn off the coffee maker"
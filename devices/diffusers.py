@@ -3,29 +3,31 @@ Scent diffuser controller via Zigbee2MQTT.
 Controls smart plugs connected to diffusers through MQTT commands.
 """
 
-import json
-import os
+import logging
 from typing import Optional, Dict
 
+import orjson
 import paho.mqtt.client as mqtt
 
-from config import config
+from devices import _mqtt
+from devices._device_config import load as load_device_config
 
 
-def _load_device_config():
-    """Load device configuration from config/devices.json."""
-    config_path = os.path.join(os.path.dirname(__file__), "..", "config", "devices.json")
-    try:
-        with open(config_path) as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"[Diffusers] Warning: {config_path} not found, using empty config")
-        return {"diffusers": {}}
-
+log = logging.getLogger("reality.diffusers")
 
 # Load diffuser configuration from config/devices.json
-_device_config = _load_device_config()
+_device_config = load_device_config()
 DIFFUSERS: Dict[str, dict] = _device_config.get("diffusers", {})
+_AVAILABLE_SCENTS = ", ".join(DIFFUSERS)
+
+# MQTT topics per scent
+_STATE_TOPICS: Dict[str, str] = {
+    name: _mqtt.TOPIC_PREFIX + diffuser["id"] for name, diffuser in DIFFUSERS.items()
+}
+_SET_TOPICS: Dict[str, str] = {name: f"{topic}/set" for name, topic in _STATE_TOPICS.items()}
+
+# (scent, fixed start of its get_status line)
+_STATUS_PREFIXES = tuple((name, f"  - {d['name']}: ") for name, d in DIFFUSERS.items())
 
 
 class DiffuserController:
@@ -35,58 +37,39 @@ class DiffuserController:
     """
 
     def __init__(self):
-        self.client: Optional[mqtt.Client] = None
-        self._connected = False
         self._states: Dict[str, bool] = {name: False for name in DIFFUSERS}
-        self._connect()
-
-    def _connect(self):
-        """Connect to MQTT broker."""
-        try:
-            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-            self.client.on_connect = self._on_connect
-            self.client.on_message = self._on_message
-            self.client.connect(config.MQTT_BROKER, config.MQTT_PORT, 60)
-            self.client.loop_start()
-        except Exception as e:
-            print(f"[Diffusers] Failed to connect to MQTT: {e}")
+        # Zigbee device ID -> scent name, for routing state updates
+        self._by_id: Dict[str, str] = {d["id"]: name for name, d in DIFFUSERS.items()}
 
-    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
-        """Called when connected to MQTT broker."""
-        self._connected = True
-        print(f"[Diffusers] Connected to MQTT broker")
-
-        # Subscribe to state updates for all diffusers
-        for name, diffuser in DIFFUSERS.items():
-            topic = f"zigbee2mqtt/{diffuser['id']}"
-            client.subscribe(topic)
+        # Shared broker connection; subscribe to state updates for all diffusers
+        self.client: Optional[mqtt.Client] = _mqtt.get_shared_client()
+        for topic in _STATE_TOPICS.values():
+            _mqtt.subscribe(topic, self._on_message)
 
     def _on_message(self, client, userdata, msg):
         """Called when a message is received - track state updates."""
         try:
-            payload = json.loads(msg.payload.decode())
-
-            # Find which diffuser this is for
-            for name, diffuser in DIFFUSERS.items():
-                if diffuser['id'] in msg.topic:
-                    state = payload.get("state", "OFF") == "ON"
-                    self._states[name] = state
-                    break
+            # Find which diffuser this is for (zigbee2mqtt/0x...)
+            name = self._by_id.get(msg.topic[len(_mqtt.TOPIC_PREFIX):])
+            if name is None:
+                return
+
+            payload = orjson.loads(msg.payload)
+            self._states[name] = payload.get("state", "OFF") == "ON"
         except Exception:
             pass
 
-    def _publish(self, device_id: str, payload: dict) -> bool:
-        """Publish a command to a diffuser."""
-        if not self.client or not self._connected:
-            print("[Diffusers] Not connected to MQTT")
+    def _publish(self, topic: str, payload: bytes) -> bool:
+        """Publish a command to a diffuser's set topic."""
+        if not self.client or not _mqtt.is_connected():
+            log.warning("[Diffusers] Not connected to MQTT")
             return False
 
-        topic = f"zigbee2mqtt/{device_id}/set"
         try:
-            self.client.publish(topic, json.dumps(payload))
+            self.client.publish(topic, payload)
             return True
         except Exception as e:
-            print(f"[Diffusers] Failed to publish: {e}")
+            log.warning("[Diffusers] Failed to publish: %s", e)
             return False
 
     def turn_on(self, scent: str) -> str:
@@ -94,11 +77,10 @@ class DiffuserController:
         scent_lower = scent.lower()
 
         if scent_lower not in DIFFUSERS:
-            available = ", ".join(DIFFUSERS.keys())
-            return f"Unknown scent '{scent}'. Available: {available}"
+            return f"Unknown scent '{scent}'. Available: {_AVAILABLE_SCENTS}"
 
         diffuser = DIFFUSERS[scent_lower]
-        if self._publish(diffuser["id"], {"state": "ON"}):
+        if self._publish(_SET_TOPICS[scent_lower], _mqtt.PAYLOAD_ON):
             self._states[scent_lower] = True
             return f"{diffuser['name']} is now on. {diffuser['description']}"
         return f"Failed to turn on {diffuser['name']}"
@@ -108,11 +90,10 @@ class DiffuserController:
         scent_lower = scent.lower()
 
         if scent_lower not in DIFFUSERS:
-            available = ", ".join(DIFFUSERS.keys())
-            return f"Unknown scent '{scent}'. Available: {available}"
+            return f"Unknown scent '{scent}'. Available: {_AVAILABLE_SCENTS}"
 
         diffuser = DIFFUSERS[scent_lower]
-        if self._publish(diffuser["id"], {"state": "OFF"}):
+        if self._publish(_SET_TOPICS[scent_lower], _mqtt.PAYLOAD_OFF):
             self._states[scent_lower] = False
             return f"{diffuser['name']} is now off"
         return f"Failed to turn off {diffuser['name']}"
@@ -136,9 +117,10 @@ class DiffuserController:
     def get_status(self) -> str:
         """Get the current status of all diffusers."""
         lines = ["Diffuser status:"]
-        for scent, diffuser in DIFFUSERS.items():
-            state = "on" if self._states.get(scent, False) else "off"
-            lines.append(f"  - {diffuser['name']}: {state}")
+        lines.extend(
+            prefix + ("on" if self._states.get(scent, False) else "off")
+            for scent, prefix in _STATUS_PREFIXES
+        )
         return "\n".join(lines)
 
     def get_scent_info(self, scent: str) -> str:
@@ -146,8 +128,7 @@ class DiffuserController:
         scent_lower = scent.lower()
 
         if scent_lower not in DIFFUSERS:
-            available = ", ".join(DIFFUSERS.keys())
-            return f"Unknown scent '{scent}'. Available: {available}"
+            return f"Unknown scent '{scent}'. Available: {_AVAILABLE_SCENTS}"
 
         diffuser = DIFFUSERS[scent_lower]
         state = "on" if self._states.get(scent_lower, False) else "off"
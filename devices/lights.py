@@ -3,32 +3,28 @@ Light controller via Zigbee2MQTT.
 Controls smart bulbs through MQTT commands.
 """
 
-import json
-import os
+import logging
+import queue
+import threading
 import time
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from typing import Optional, Dict, Iterable, List, Tuple
+from dataclasses import dataclass, field
+from functools import cache
 
+import orjson
 import paho.mqtt.client as mqtt
 
-from config import config
+from devices import _mqtt
+from devices._device_config import load as load_device_config
 
 
-def _load_device_config():
-    """Load device configuration from config/devices.json."""
-    config_path = os.path.join(os.path.dirname(__file__), "..", "config", "devices.json")
-    try:
-        with open(config_path) as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"[Lights] Warning: {config_path} not found, using empty config")
-        return {"lights": {}, "rooms": {}}
+log = logging.getLogger("reality.lights")
 
 # Delay between commands to different lights (Zigbee mesh needs time)
 COMMAND_DELAY = 0.15  # 150ms between commands
 
 
-@dataclass
+@dataclass(slots=True)
 class Light:
     """Represents a smart light."""
     id: str  # Zigbee device ID
@@ -39,6 +35,13 @@ class Light:
     color_temp: int = 300  # 154 (cool) to 500 (warm)
     hue: int = 0  # 0-360
     saturation: int = 0  # 0-100
+    # Topics stay str: paho's publish() encodes the topic itself and rejects bytes
+    state_topic: str = field(init=False, repr=False)  # State updates arrive here
+    set_topic: str = field(init=False, repr=False)  # Commands go here
+
+    def __post_init__(self):
+        self.state_topic = _mqtt.TOPIC_PREFIX + self.id
+        self.set_topic = f"{self.state_topic}/set"
 
 
 # Named colors mapped to hue/saturation
@@ -55,111 +58,185 @@ COLORS: Dict[str, tuple] = {
     "white": (0, 0),  # No saturation = white
 }
 
+# Reply for a color not in COLORS
+_UNKNOWN_COLOR = f"I don't know that color. Try: {', '.join(COLORS)}"
 
-# Load device configuration
-_device_config = _load_device_config()
+# 0-100 percent -> Zigbee brightness (0-254) and color temp (154 cool - 500 warm)
+_BRIGHTNESS_TABLE = tuple(int(pct * 2.54) for pct in range(101))
+_COLOR_TEMP_TABLE = tuple(154 + int(pct * 3.46) for pct in range(101))
+
+# Pre-serialized command payloads; the %d ones are filled in with bytes formatting
+_PAYLOAD_BRIGHTNESS = b'{"state":"ON","brightness":%d}'
+_PAYLOAD_COLOR_TEMP = b'{"state":"ON","color_temp":%d}'
+_PAYLOAD_COLOR = b'{"state":"ON","color":{"hue":%d,"saturation":%d}}'
+_PAYLOAD_GET_STATE = b'{"state":""}'
+
+# Fixed text around the per-light lines in get_light_context
+_LIGHT_CONTEXT_HEADER = "Current light states:\n"
+_LIGHT_CONTEXT_FOOTER = "\n\nYou control these lights. You know their current state."
+
+# Closest named color for each hue degree: upper bounds (exclusive) of each range
+_HUE_NAMES = ("red", "orange", "yellow", "green", "cyan", "blue", "purple", "pink", "red")
+_HUE_BOUNDS = (15, 45, 70, 150, 210, 270, 330, 345, 360)
+_HUE_TO_NAME = bytes(
+    next(i for i, bound in enumerate(_HUE_BOUNDS) if hue < bound) for hue in range(360)
+)
+
+
+@cache
+def get_lights() -> Dict[str, Light]:
+    """Light configuration - loaded from config/devices.json on first use."""
+    return {
+        name: Light(
+            id=data["id"],
+            name=data["name"],
+            location=data["location"]
+        )
+        for name, data in load_device_config().get("lights", {}).items()
+    }
 
-# Light configuration - loaded from config/devices.json
-LIGHTS: Dict[str, Light] = {
-    name: Light(
-        id=data["id"],
-        name=data["name"],
-        location=data["location"]
-    )
-    for name, data in _device_config.get("lights", {}).items()
-}
 
-# Room groupings - loaded from config/devices.json
-ROOMS: Dict[str, List[str]] = _device_config.get("rooms", {})
+@cache
+def get_rooms() -> Dict[str, List[str]]:
+    """Room groupings - loaded from config/devices.json on first use."""
+    return load_device_config().get("rooms", {})
+
+
+def __getattr__(name: str):
+    # LIGHTS and ROOMS stay importable, but are only built when first read
+    if name == "LIGHTS":
+        return get_lights()
+    if name == "ROOMS":
+        return get_rooms()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class LightController:
     """Controls smart lights via Zigbee2MQTT."""
 
     def __init__(self):
-        self.client: Optional[mqtt.Client] = None
-        self._connected = False
+        self._lights = get_lights()
+        self._rooms = get_rooms()
         # Track actual light states from Zigbee2MQTT
         self._light_states: Dict[str, Dict] = {}
-        self._connect()
-
-    def _connect(self):
-        """Connect to MQTT broker."""
-        try:
-            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-            self.client.on_connect = self._on_connect
-            self.client.on_message = self._on_message
-            self.client.connect(config.MQTT_BROKER, config.MQTT_PORT, 60)
-            self.client.loop_start()
-        except Exception as e:
-            print(f"[Lights] Failed to connect to MQTT: {e}")
-
-    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
-        """Called when connected to MQTT broker."""
-        self._connected = True
-        print(f"[Lights] Connected to MQTT broker")
-        # Subscribe to state updates for all lights
-        for light in LIGHTS.values():
-            topic = f"zigbee2mqtt/{light.id}"
-            client.subscribe(topic)
-            # Request current state
-            client.publish(f"zigbee2mqtt/{light.id}/get", '{"state": ""}')
-        print(f"[Lights] Subscribed to {len(LIGHTS)} light state topics")
+        # Zigbee device ID -> Light, for routing state updates
+        self._by_id: Dict[str, Light] = {light.id: light for light in self._lights.values()}
+        self._get_topics = tuple(f"{light.state_topic}/get" for light in self._lights.values())
+        # Lowercased names for fuzzy matching
+        self._lights_lower: Dict[str, Light] = {
+            name.lower(): light for name, light in self._lights.items()
+        }
+        self._light_match_keys: List[Tuple[str, str, Light]] = [
+            (name.lower(), light.location.lower(), light) for name, light in self._lights.items()
+        ]
+        self._rooms_lower: Dict[str, List[Light]] = {
+            room.lower(): [self._lights[name] for name in names]
+            for room, names in self._rooms.items()
+        }
+        # Fixed start of each light's line in get_detailed_status
+        self._status_prefix: Dict[str, str] = {
+            name: f"- {light.location}: " for name, light in self._lights.items()
+        }
+
+        # Commands go out on a worker, paced COMMAND_DELAY apart, so callers
+        # never wait on the mesh. One entry per call:
+        # (monotonic deadline of the first command, set topics, payload).
+        self._commands: "queue.Queue[Tuple[float, Tuple[str, ...], bytes]]" = queue.Queue()
+        self._schedule_lock = threading.Lock()
+        self._next_slot = 0.0  # Earliest deadline for the next queued command
+        threading.Thread(target=self._command_worker, name="lights-commands", daemon=True).start()
+
+        # Shared broker connection; subscribe to state updates for all lights
+        self.client: Optional[mqtt.Client] = _mqtt.get_shared_client()
+        for light in self._lights.values():
+            _mqtt.subscribe(light.state_topic, self._on_message)
+        _mqtt.on_connect(self._on_connect)
+
+    def _on_connect(self, client: mqtt.Client):
+        """Called on every (re)connect to the MQTT broker."""
+        # Request current state, paced like any other burst to the mesh
+        self._schedule(self._get_topics, _PAYLOAD_GET_STATE)
+        log.info("[Lights] Subscribed to %d light state topics", len(self._lights))
 
     def _on_message(self, client, userdata, msg):
         """Handle incoming light state updates."""
         try:
             # Extract device ID from topic (zigbee2mqtt/0x...)
-            topic_parts = msg.topic.split('/')
-            if len(topic_parts) < 2:
+            topic = msg.topic
+            if not topic.startswith(_mqtt.TOPIC_PREFIX):
                 return
-            device_id = topic_parts[1]
+            device_id = topic[len(_mqtt.TOPIC_PREFIX):]
 
             # Parse state
-            payload = json.loads(msg.payload.decode())
+            payload = orjson.loads(msg.payload)
             self._light_states[device_id] = payload
 
-            # Update our Light objects
-            for light in LIGHTS.values():
-                if light.id == device_id:
-                    old_state = light.state
-                    light.state = payload.get("state", "OFF") == "ON"
-                    light.brightness = payload.get("brightness", 254)
-                    if "color" in payload:
-                        light.hue = payload["color"].get("hue", 0)
-                        light.saturation = payload["color"].get("saturation", 0)
-                    if "color_temp" in payload:
-                        light.color_temp = payload["color_temp"]
-                    # Log state changes
-                    if old_state != light.state:
-                        print(f"[Lights] {light.location} now {'on' if light.state else 'off'}")
+            # Update our Light object
+            light = self._by_id.get(device_id)
+            if light is None:
+                return
+            old_state = light.state
+            light.state = payload.get("state", "OFF") == "ON"
+            light.brightness = payload.get("brightness", 254)
+            if "color" in payload:
+                light.hue = payload["color"].get("hue", 0)
+                light.saturation = payload["color"].get("saturation", 0)
+            if "color_temp" in payload:
+                light.color_temp = payload["color_temp"]
+            # Log state changes
+            if old_state != light.state:
+                log.debug("[Lights] %s now %s", light.location, "on" if light.state else "off")
         except Exception as e:
-            print(f"[Lights] Error parsing state: {e}")
+            log.warning("[Lights] Error parsing state: %s", e)
 
-    def _publish(self, device_id: str, payload: Dict[str, Any]) -> bool:
-        """Publish a command to a light."""
-        if not self._connected or not self.client:
-            print("[Lights] Not connected to MQTT")
+    def _publish(self, topic: str, payload: bytes) -> bool:
+        """Publish a command to a light's set topic."""
+        if not self.client or not _mqtt.is_connected():
+            log.warning("[Lights] Not connected to MQTT")
             return False
 
-        topic = f"zigbee2mqtt/{device_id}/set"
         try:
-            self.client.publish(topic, json.dumps(payload))
+            self.client.publish(topic, payload, qos=0, retain=False)
             return True
         except Exception as e:
-            print(f"[Lights] Failed to publish: {e}")
+            log.warning("[Lights] Failed to publish: %s", e)
             return False
 
+    def _send(self, lights: Iterable[Light], payload: bytes):
+        """Queue a command for each light, spaced COMMAND_DELAY apart. Returns immediately."""
+        self._schedule(tuple(light.set_topic for light in lights), payload)
+
+    def _schedule(self, topics: Tuple[str, ...], payload: bytes):
+        """Queue payload for each topic, after anything already queued."""
+        with self._schedule_lock:
+            start = max(time.monotonic(), self._next_slot)
+            self._commands.put((start, topics, payload))
+            self._next_slot = start + len(topics) * COMMAND_DELAY
+
+    def _command_worker(self):
+        """Publish queued commands as their deadlines come up."""
+        while True:
+            start, topics, payload = self._commands.get()
+            for i, topic in enumerate(topics):
+                delay = start + i * COMMAND_DELAY - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self._publish(topic, payload)
+
     def _get_light(self, name: str) -> Optional[Light]:
         """Get a light by name, with fuzzy matching."""
         # Exact match
-        if name in LIGHTS:
-            return LIGHTS[name]
+        if name in self._lights:
+            return self._lights[name]
 
-        # Try to match by location or partial name
         name_lower = name.lower()
-        for light_name, light in LIGHTS.items():
-            if name_lower in light_name.lower() or name_lower in light.location.lower():
+        light = self._lights_lower.get(name_lower)
+        if light:
+            return light
+
+        # Try to match by location or partial name
+        for light_name, location, light in self._light_match_keys:
+            if name_lower in light_name or name_lower in location:
                 return light
 
         return None
@@ -167,9 +244,12 @@ class LightController:
     def _get_room_lights(self, room: str) -> List[Light]:
         """Get all lights in a room."""
         room_lower = room.lower()
-        for room_name, light_names in ROOMS.items():
-            if room_lower in room_name.lower():
-                return [LIGHTS[name] for name in light_names]
+        lights = self._rooms_lower.get(room_lower)
+        if lights is not None:
+            return lights
+        for room_name, lights in self._rooms_lower.items():
+            if room_lower in room_name:
+                return lights
         return []
 
     # === Public API ===
@@ -185,22 +265,22 @@ class LightController:
         Returns:
             Status message
         """
+        payload = _mqtt.PAYLOAD_ON
+        if brightness is not None:
+            zigbee_brightness = _BRIGHTNESS_TABLE[max(0, min(100, brightness))]
+            payload = _PAYLOAD_BRIGHTNESS % zigbee_brightness
+
         # Check if it's a room
         room_lights = self._get_room_lights(target)
         if room_lights:
-            payload = {"state": "ON"}
-            if brightness is not None:
-                payload["brightness"] = int(brightness * 2.54)  # Convert 0-100 to 0-254
-
             for light in room_lights:
-                self._publish(light.id, payload)
                 # Update local state immediately
                 light.state = True
                 if brightness:
-                    light.brightness = payload["brightness"]
-                time.sleep(COMMAND_DELAY)
+                    light.brightness = zigbee_brightness
+            self._send(room_lights, payload)
 
-            print(f"[Lights] Turned on {target}")
+            log.info("[Lights] Turned on %s", target)
             return f"Turned on {len(room_lights)} lights in the {target}"
 
         # Single light
@@ -208,17 +288,13 @@ class LightController:
         if not light:
             return f"I don't know a light called '{target}'"
 
-        payload = {"state": "ON"}
-        if brightness is not None:
-            payload["brightness"] = int(brightness * 2.54)
-
-        self._publish(light.id, payload)
+        self._send([light], payload)
         # Update local state immediately
         light.state = True
         if brightness:
-            light.brightness = payload["brightness"]
+            light.brightness = zigbee_brightness
 
-        print(f"[Lights] Turned on {light.location}")
+        log.info("[Lights] Turned on %s", light.location)
         return f"Turned on the {light.location} light"
 
     def turn_off(self, target: str) -> str:
@@ -235,9 +311,8 @@ class LightController:
         room_lights = self._get_room_lights(target)
         if room_lights:
             for light in room_lights:
-                self._publish(light.id, {"state": "OFF"})
                 light.state = False
-                time.sleep(COMMAND_DELAY)
+            self._send(room_lights, _mqtt.PAYLOAD_OFF)
 
             return f"Turned off the {target} lights"
 
@@ -246,7 +321,7 @@ class LightController:
         if not light:
             return f"I don't know a light called '{target}'"
 
-        self._publish(light.id, {"state": "OFF"})
+        self._send([light], _mqtt.PAYLOAD_OFF)
         light.state = False
 
         return f"Turned off the {light.location} light"
@@ -263,16 +338,15 @@ class LightController:
             Status message
         """
         brightness = max(0, min(100, brightness))  # Clamp to 0-100
-        zigbee_brightness = int(brightness * 2.54)  # Convert to 0-254
+        zigbee_brightness = _BRIGHTNESS_TABLE[brightness]
 
         # Check if it's a room
         room_lights = self._get_room_lights(target)
         if room_lights:
             for light in room_lights:
-                self._publish(light.id, {"state": "ON", "brightness": zigbee_brightness})
                 light.brightness = zigbee_brightness
                 light.state = True
-                time.sleep(COMMAND_DELAY)
+            self._send(room_lights, _PAYLOAD_BRIGHTNESS % zigbee_brightness)
 
             return f"Set {target} lights to {brightness}%"
 
@@ -281,30 +355,28 @@ class LightController:
         if not light:
             return f"I don't know a light called '{target}'"
 
-        self._publish(light.id, {"state": "ON", "brightness": zigbee_brightness})
+        self._send([light], _PAYLOAD_BRIGHTNESS % zigbee_brightness)
         light.brightness = zigbee_brightness
 
         return f"Set the {light.location} light to {brightness}%"
 
     def turn_all_on(self, brightness: int = None) -> str:
         """Turn on all lights."""
-        payload = {"state": "ON"}
+        payload = _mqtt.PAYLOAD_ON
         if brightness is not None:
-            payload["brightness"] = int(brightness * 2.54)
+            payload = _PAYLOAD_BRIGHTNESS % _BRIGHTNESS_TABLE[max(0, min(100, brightness))]
 
-        for light in LIGHTS.values():
-            self._publish(light.id, payload)
+        for light in self._lights.values():
             light.state = True
-            time.sleep(COMMAND_DELAY)
+        self._send(self._lights.values(), payload)
 
         return "Turned on all lights"
 
     def turn_all_off(self) -> str:
         """Turn off all lights."""
-        for light in LIGHTS.values():
-            self._publish(light.id, {"state": "OFF"})
+        for light in self._lights.values():
             light.state = False
-            time.sleep(COMMAND_DELAY)
+        self._send(self._lights.values(), _mqtt.PAYLOAD_OFF)
 
         return "Turned off all lights"
 
@@ -312,35 +384,32 @@ class LightController:
         """Set color for ALL lights with delays between commands."""
         color_lower = color.lower()
         if color_lower not in COLORS:
-            available = ", ".join(COLORS.keys())
-            return f"I don't know that color. Try: {available}"
+            return _UNKNOWN_COLOR
 
         hue, saturation = COLORS[color_lower]
-        payload = {"state": "ON", "color": {"hue": hue, "saturation": saturation}}
+        payload = _PAYLOAD_COLOR % (hue, saturation)
 
-        for light in LIGHTS.values():
-            self._publish(light.id, payload)
+        for light in self._lights.values():
             light.hue = hue
             light.saturation = saturation
             light.state = True
-            time.sleep(COMMAND_DELAY)
+        self._send(self._lights.values(), payload)
 
-        print(f"[Lights] Set all to {color}")
+        log.info("[Lights] Set all to %s", color)
         return f"Set all lights to {color}"
 
     def set_all_brightness(self, brightness: int) -> str:
         """Set brightness for ALL lights with delays between commands."""
         brightness = max(0, min(100, brightness))
-        zigbee_brightness = int(brightness * 2.54)
-        payload = {"state": "ON", "brightness": zigbee_brightness}
+        zigbee_brightness = _BRIGHTNESS_TABLE[brightness]
+        payload = _PAYLOAD_BRIGHTNESS % zigbee_brightness
 
-        for light in LIGHTS.values():
-            self._publish(light.id, payload)
+        for light in self._lights.values():
             light.brightness = zigbee_brightness
             light.state = True
-            time.sleep(COMMAND_DELAY)
+        self._send(self._lights.values(), payload)
 
-        print(f"[Lights] Set all to {brightness}%")
+        log.info("[Lights] Set all to %d%%", brightness)
         return f"Set all lights to {brightness}%"
 
     def set_all_color_temp(self, warmth: str) -> str:
@@ -359,48 +428,39 @@ class LightController:
             try:
                 value = int(warmth)
                 value = max(0, min(100, value))
-                color_temp = 154 + int(value * 3.46)
+                color_temp = _COLOR_TEMP_TABLE[value]
                 desc = f"{value}% warm"
             except ValueError:
                 return "I didn't understand that. Try 'warm', 'cool', or a number 0-100."
 
-        payload = {"state": "ON", "color_temp": color_temp}
+        payload = _PAYLOAD_COLOR_TEMP % color_temp
 
-        for light in LIGHTS.values():
-            self._publish(light.id, payload)
+        for light in self._lights.values():
             light.color_temp = color_temp
             light.state = True
-            time.sleep(COMMAND_DELAY)
+        self._send(self._lights.values(), payload)
 
-        print(f"[Lights] Set all to {desc}")
+        log.info("[Lights] Set all to %s", desc)
         return f"Set all lights to {desc}"
 
     def get_status(self) -> str:
         """Get a summary of all lights."""
-        on_lights = [l for l in LIGHTS.values() if l.state]
-        off_lights = [l for l in LIGHTS.values() if not l.state]
+        on_locations = [l.location for l in self._lights.values() if l.state]
 
-        if not on_lights:
+        if not on_locations:
             return "All lights are off"
-        elif not off_lights:
+        elif len(on_locations) == len(self._lights):
             return "All lights are on"
         else:
-            on_locations = [l.location for l in on_lights]
             return f"Lights on in: {', '.join(on_locations)}"
 
     def get_detailed_status(self) -> str:
         """Get detailed status of all lights for Alfred's awareness."""
-        lines = []
-        for name, light in LIGHTS.items():
-            state = "on" if light.state else "off"
-            brightness_pct = int(light.brightness / 2.54)
-
-            # Determine color description
-            color_desc = self._describe_color(light)
-
-            lines.append(f"- {light.location}: {state}, {brightness_pct}% brightness, {color_desc}")
-
-        return "\n".join(lines)
+        return "\n".join(
+            f"{self._status_prefix[name]}{'on' if light.state else 'off'}, "
+            f"{light.brightness * 100 // 254}% brightness, {self._describe_color(light)}"
+            for name, light in self._lights.items()
+        )
 
     def _describe_color(self, light: Light) -> str:
         """Get a human-readable color description."""
@@ -414,38 +474,19 @@ class LightController:
                 return "neutral white"
 
         # Find closest named color by hue
-        hue = light.hue
-        if hue < 15 or hue >= 345:
-            return "red"
-        elif hue < 45:
-            return "orange"
-        elif hue < 70:
-            return "yellow"
-        elif hue < 150:
-            return "green"
-        elif hue < 210:
-            return "cyan"
-        elif hue < 270:
-            return "blue"
-        elif hue < 330:
-            return "purple"
-        else:
-            return "pink"
+        return _HUE_NAMES[_HUE_TO_NAME[int(light.hue) % 360]]
 
     def get_light_context(self) -> str:
         """Get light status formatted for Alfred's context."""
-        return f"""Current light states:
-{self.get_detailed_status()}
-
-You control these lights. You know their current state."""
+        return _LIGHT_CONTEXT_HEADER + self.get_detailed_status() + _LIGHT_CONTEXT_FOOTER
 
     def get_available_lights(self) -> List[str]:
         """Get list of available light names."""
-        return list(LIGHTS.keys())
+        return list(self._lights.keys())
 
     def get_available_rooms(self) -> List[str]:
         """Get list of rooms with lights."""
-        return list(ROOMS.keys())
+        return list(self._rooms.keys())
 
     def set_color(self, target: str, color: str) -> str:
         """
@@ -460,23 +501,21 @@ You control these lights. You know their current state."""
         """
         color_lower = color.lower()
         if color_lower not in COLORS:
-            available = ", ".join(COLORS.keys())
-            return f"I don't know that color. Try: {available}"
+            return _UNKNOWN_COLOR
 
         hue, saturation = COLORS[color_lower]
-        payload = {"state": "ON", "color": {"hue": hue, "saturation": saturation}}
+        payload = _PAYLOAD_COLOR % (hue, saturation)
 
         # Check if it's a room
         room_lights = self._get_room_lights(target)
         if room_lights:
             for light in room_lights:
-                self._publish(light.id, payload)
                 # Update local state
                 light.hue = hue
                 light.saturation = saturation
                 light.state = True  # Setting color turns light on
-                time.sleep(COMMAND_DELAY)
-            print(f"[Lights] Set {target} to {color}")
+            self._send(room_lights, payload)
+            log.info("[Lights] Set %s to %s", target, color)
             return f"Set {target} lights to {color}"
 
         # Single light
@@ -484,12 +523,12 @@ You control these lights. You know their current state."""
         if not light:
             return f"I don't know a light called '{target}'"
 
-        self._publish(light.id, payload)
+        self._send([light], payload)
         # Update local state
         light.hue = hue
         light.saturation = saturation
         light.state = True
-        print(f"[Lights] Set {light.location} to {color}")
+        log.info("[Lights] Set %s to %s", light.location, color)
         return f"Set the {light.location} light to {color}"
 
     def set_color_temp(self, target: str, warmth: str) -> str:
@@ -521,21 +560,20 @@ You control these lights. You know their current state."""
                 value = int(warmth)
                 value = max(0, min(100, value))
                 # Map 0-100 to 154-500
-                color_temp = 154 + int(value * 3.46)
+                color_temp = _COLOR_TEMP_TABLE[value]
                 desc = f"{value}% warm"
             except ValueError:
                 return "I didn't understand that. Try 'warm', 'cool', or a number 0-100."
 
-        payload = {"state": "ON", "color_temp": color_temp}
+        payload = _PAYLOAD_COLOR_TEMP % color_temp
 
         # Check if it's a room
         room_lights = self._get_room_lights(target)
         if room_lights:
             for light in room_lights:
-                self._publish(light.id, payload)
                 light.color_temp = color_temp
                 light.state = True
-                time.sleep(COMMAND_DELAY)
+            self._send(room_lights, payload)
             return f"Set {target} lights to {desc}"
 
         # Single light
@@ -543,7 +581,7 @@ You control these lights. You know their current state."""
         if not light:
             return f"I don't know a light called '{target}'"
 
-        self._publish(light.id, payload)
+        self._send([light], payload)
         light.color_temp = color_temp
         return f"Set the {light.location} light to {desc}"
 
@@ -4,12 +4,616 @@ macOS: Uses AppleScript to control Apple Music/Spotify
 Windows: Uses Spotify global hotkeys (limited functionality)
 """
 
+import ctypes
+import logging
+import os
 import platform
+import select
+import shutil
 import subprocess
+import threading
+import time
+import urllib.parse
 from typing import Optional
 
+import orjson
+
+
+log = logging.getLogger("reality.music")
+
 PLATFORM = platform.system()  # "Darwin" for macOS, "Windows" for Windows
 
+# Optional (pyobjc-framework-OSAKit): compile and run AppleScript in-process
+# instead of spawning osascript for every command
+OSAScript = None
+if PLATFORM == "Darwin":
+    try:
+        from Foundation import NSAppleEventDescriptor
+        from OSAKit import OSAScript
+    except ImportError:
+        pass
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_ushort),
+        ("wScan", ctypes.c_ushort),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    # Only here so the INPUT union has its full size
+    _fields_ = [
+        ("dx", ctypes.c_long),
+        ("dy", ctypes.c_long),
+        ("mouseData", ctypes.c_ulong),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", ctypes.c_ulong), ("u", _INPUTUNION)]
+
+
+# Media keys go straight to user32 on Windows, no PowerShell needed
+_user32 = None
+if PLATFORM == "Windows":
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _user32.SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(_INPUT), ctypes.c_int]
+    _user32.SendInput.restype = ctypes.c_uint
+
+SW_SHOWNORMAL = 1
+
+# URIs are opened with ShellExecuteW directly rather than through cmd.exe
+_shell32 = None
+if PLATFORM == "Windows":
+    _shell32 = ctypes.WinDLL("shell32", use_last_error=True)
+    _shell32.ShellExecuteW.argtypes = [
+        ctypes.c_void_p, ctypes.c_wchar_p, ctypes.c_wchar_p,
+        ctypes.c_wchar_p, ctypes.c_wchar_p, ctypes.c_int,
+    ]
+    _shell32.ShellExecuteW.restype = ctypes.c_void_p
+
+
+def _key_press(vk: int) -> ctypes.Array:
+    """Key down and key up for vk, ready for a single SendInput call."""
+    down = _INPUT(type=INPUT_KEYBOARD, ki=_KEYBDINPUT(wVk=vk, dwFlags=KEYEVENTF_EXTENDEDKEY))
+    up = _INPUT(type=INPUT_KEYBOARD, ki=_KEYBDINPUT(wVk=vk, dwFlags=KEYEVENTF_EXTENDEDKEY | KEYEVENTF_KEYUP))
+    return (_INPUT * 2)(down, up)
+
+
+# Optional (pycaw): set the Windows volume through Core Audio in-process
+# instead of running nircmd for every change
+AudioUtilities = None
+if PLATFORM == "Windows":
+    try:
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+    except ImportError:
+        pass
+
+_MEDIA_KEYS = {
+    "play": 0xB3,      # VK_MEDIA_PLAY_PAUSE
+    "pause": 0xB3,     # VK_MEDIA_PLAY_PAUSE
+    "next": 0xB0,      # VK_MEDIA_NEXT_TRACK
+    "prev": 0xB1,      # VK_MEDIA_PREV_TRACK
+}
+
+# Apple event codes for calling a script's run handler with arguments
+_CORE_EVENT_CLASS = 0x61657674    # 'aevt'
+_OPEN_APPLICATION = 0x6F617070    # 'oapp'
+_DIRECT_OBJECT = 0x2D2D2D2D       # '----'
+
+_APPS = ("Music", "Spotify")
+
+# One-line commands both apps understand
+_TELL_COMMANDS = {
+    "play": "play",
+    "pause": "pause",
+    "playpause": "playpause",
+    "next": "next track",
+    "previous": "previous track",
+    "state": "get player state as string",
+    "shuffle_on": "set shuffling to true",
+    "shuffle_off": "set shuffling to false",
+}
+
+# Every app script, keyed by (action, app). Nothing is interpolated at call
+# time: values like a search query are passed to the script's run handler.
+# Each script stays separate with a plain run handler rather than being
+# merged into one handler library per app, so OSAKit, the resident helper
+# and one-shot osascript can all run the same text; with OSAKit each one
+# is still compiled only once.
+_SCRIPTS = {
+    (action, app): f'tell application "{app}" to {command}'
+    for action, command in _TELL_COMMANDS.items()
+    for app in _APPS
+}
+_SCRIPTS.update({
+    ("repeat_off", "Music"): 'tell application "Music" to set song repeat to off',
+    ("repeat_one", "Music"): 'tell application "Music" to set song repeat to one',
+    ("repeat_all", "Music"): 'tell application "Music" to set song repeat to all',
+    # Spotify only has repeat on/off
+    ("repeat_off", "Spotify"): 'tell application "Spotify" to set repeating to false',
+    ("repeat_one", "Spotify"): 'tell application "Spotify" to set repeating to true',
+    ("repeat_all", "Spotify"): 'tell application "Spotify" to set repeating to true',
+})
+# Sets playerState, stateText and trackInfo inside a tell block. Track
+# properties are read in one go rather than one Apple event each.
+_TRACK_INFO = '''
+            set playerState to player state
+            set stateText to playerState as string
+            if playerState is playing or playerState is paused then
+                set {trackName, artistName, albumName} to {name, artist, album} of current track
+                if playerState is playing then
+                    set trackInfo to trackName & " by " & artistName & " from " & albumName
+                else
+                    set trackInfo to trackName & " by " & artistName & " (paused)"
+                end if
+            else
+                set trackInfo to "Nothing playing"
+            end if
+'''
+for _app in _APPS:
+    _SCRIPTS["track", _app] = f'''
+        tell application "{_app}"
+{_TRACK_INFO}
+            return trackInfo
+        end tell
+    '''
+    # State, track and system volume in one round trip, "|"-separated
+    _SCRIPTS["status", _app] = f'''
+        set outputVolume to output volume of (get volume settings)
+        tell application "{_app}"
+{_TRACK_INFO}
+        end tell
+        return stateText & "|" & trackInfo & "|" & outputVolume
+    '''
+_SCRIPTS["search", "Music"] = '''
+    on run argv
+        set query to item 1 of argv
+        tell application "Music"
+            set searchResults to search playlist "Library" for query
+            if searchResults is {} then return "No results found for " & query
+            -- Read the match's properties once, not back through current track
+            set foundTrack to item 1 of searchResults
+            set {trackName, artistName} to {name, artist} of foundTrack
+            play foundTrack
+            return "Playing " & trackName & " by " & artistName
+        end tell
+    end run
+'''
+_SCRIPTS["playlist", "Music"] = '''
+    on run argv
+        set playlistName to item 1 of argv
+        tell application "Music"
+            play playlist playlistName
+            return "Playing playlist: " & playlistName
+        end tell
+    end run
+'''
+_SCRIPTS["playlist", "Spotify"] = '''
+    on run argv
+        set playlistName to item 1 of argv
+        tell application "Spotify"
+            -- Spotify AppleScript is more limited, try to play by name
+            play track playlistName
+            return "Playing: " & playlistName
+        end tell
+    end run
+'''
+
+# System volume scripts (not tied to an app)
+_GET_VOLUME = "output volume of (get volume settings)"
+_SET_VOLUME = '''
+    on run argv
+        set volume output volume (item 1 of argv as integer)
+    end run
+'''
+
+
+def _osa_error(error) -> str:
+    """Readable message from an OSAKit error dictionary."""
+    if not error:
+        return "AppleScript error"
+    return str(error.get("OSAScriptErrorMessageKey") or error.get("NSAppleScriptErrorMessage") or error)
+
+
+def _run_event(args) -> "NSAppleEventDescriptor":
+    """A run event carrying args as argv, for scripts with an `on run argv` handler."""
+    event = NSAppleEventDescriptor.appleEventWithEventClass_eventID_targetDescriptor_returnID_transactionID_(
+        _CORE_EVENT_CLASS, _OPEN_APPLICATION, NSAppleEventDescriptor.nullDescriptor(), -1, 0
+    )
+    argv = NSAppleEventDescriptor.listDescriptor()
+    for index, arg in enumerate(args, 1):
+        argv.insertDescriptor_atIndex_(NSAppleEventDescriptor.descriptorWithString_(str(arg)), index)
+    event.setParamDescriptor_forKeyword_(argv, _DIRECT_OBJECT)
+    return event
+
+
+# Long-lived JXA process that runs AppleScript sent over stdin, one JSON
+# request per line, so the fallback path pays osascript's startup once
+_HELPER_JS = r'''
+ObjC.import("Foundation");
+function run() {
+    var app = Application.currentApplication();
+    app.includeStandardAdditions = true;
+    var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+    var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+    var buffer = "";
+    while (true) {
+        var data = stdin.availableData;
+        if (data.length === 0) return;
+        buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+        var end;
+        while ((end = buffer.indexOf("\n")) >= 0) {
+            var request = JSON.parse(buffer.slice(0, end));
+            buffer = buffer.slice(end + 1);
+            var reply;
+            try {
+                var options = {in: "AppleScript"};
+                if (request.args.length) options.withParameters = request.args;
+                var result = app.runScript(request.script, options);
+                reply = {ok: true, out: result == null ? "" : String(result)};
+            } catch (e) {
+                reply = {ok: false, out: String(e)};
+            }
+            stdout.writeData($(JSON.stringify(reply) + "\n").dataUsingEncoding($.NSUTF8StringEncoding));
+        }
+    }
+}
+'''
+
+HELPER_TIMEOUT = 10  # Seconds, same as a one-shot command
+
+# How long a read or set system volume is trusted (duck/restore come in quick pairs)
+VOLUME_CACHE_TTL = 1.0
+
+# How long a seen or caused "playing" state is trusted to skip the output check
+PLAYER_STATE_TTL = 60.0
+
+
+class _AppleScriptHelper:
+    """A resident osascript process. Not thread-safe; callers serialize."""
+
+    def __init__(self, osascript: str):
+        self._osascript = osascript
+        self._proc: Optional[subprocess.Popen] = None
+        self._buffer = b""
+        self._unavailable = False  # osascript couldn't be started; don't keep trying
+
+    def _start(self) -> bool:
+        try:
+            self._proc = subprocess.Popen(
+                [self._osascript, "-l", "JavaScript", "-e", _HELPER_JS],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+                start_new_session=True,
+            )
+        except OSError as e:
+            log.warning("[Music] AppleScript helper unavailable: %s", e)
+            self._proc = None
+            self._unavailable = True
+            return False
+        self._buffer = b""
+        return True
+
+    def _kill(self):
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+    def run(self, script: str, args: tuple) -> Optional[tuple[bool, str]]:
+        """Run script with args. None if the helper can't be used (caller falls back)."""
+        if self._unavailable:
+            return None
+        if (self._proc is None or self._proc.poll() is not None) and not self._start():
+            return None
+        try:
+            self._proc.stdin.write(orjson.dumps({"script": script, "args": list(args)}) + b"\n")
+        except OSError:
+            self._kill()
+            return None
+
+        deadline = time.monotonic() + HELPER_TIMEOUT
+        stdout = self._proc.stdout
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([stdout], [], [], remaining)[0]:
+                # Stuck on a hung app; start fresh next time
+                self._kill()
+                return False, "Command timed out"
+            chunk = os.read(stdout.fileno(), 65536)
+            if not chunk:
+                self._kill()
+                return None
+            self._buffer += chunk
+
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        try:
+            reply = orjson.loads(line)
+            return reply["ok"], reply["out"].strip()
+        except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError):
+            # Stray output - the stream can't be trusted to line up with requests any more
+            self._kill()
+            return None
+
+
+def _run_command(cmd: list) -> tuple[bool, str]:
+    """Run a shell command and return (success, output)."""
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=10,
+            # Our own process group, so a Ctrl+C meant for us doesn't hit it
+            start_new_session=True,
+        )
+        if result.returncode == 0:
+            return True, result.stdout.strip()
+        else:
+            return False, result.stderr.strip()
+    except subprocess.TimeoutExpired:
+        return False, "Command timed out"
+    except Exception as e:
+        return False, str(e)
+
+
+class _Backend:
+    """
+    Platform-specific side of MusicController, picked once at startup.
+    This base is what unsupported platforms get; subclasses override
+    what their platform can do.
+    """
+
+    # Whether run_script works (track info, playlists, shuffle, ...)
+    has_applescript = False
+
+    def run_script(self, script: str, *args: str) -> tuple[bool, str]:
+        """Run AppleScript source, passing args to its run handler."""
+        return False, "AppleScript not available on this platform"
+
+    def run_action(self, action: str, app: str, *args: str) -> tuple[bool, str]:
+        """Run the script for (action, app), passing args to its run handler."""
+        script = _SCRIPTS.get((action, app))
+        if script is None:
+            return False, f"Not supported for {app}"
+        return self.run_script(script, *args)
+
+    def playback(self, action: str, app: str) -> tuple[bool, str]:
+        """Run a playback action (play, pause, playpause, next, previous). Returns (success, reply)."""
+        return False, "Playback control not available on this platform"
+
+    def current_output(self) -> Optional[str]:
+        """Current audio output device, or None if outputs can't be switched here."""
+        return None
+
+    def switch_output(self, device_name: str) -> tuple[bool, str]:
+        return False, "Audio switching not available on this platform"
+
+    def get_volume(self) -> Optional[int]:
+        """System volume (0-100), or None if it can't be read."""
+        return None
+
+    def set_volume(self, level: int) -> tuple[bool, str]:
+        """Set the system volume. Returns (success, error message)."""
+        return False, "Volume control not available on this platform"
+
+    def adjust_volume(self, direction: str) -> str:
+        """Step the volume without knowing the current level."""
+        return "Volume control not available on this platform"
+
+    def open_url(self, url: str) -> bool:
+        """Open a URL (e.g. spotify:search:...) with its registered app."""
+        return False
+
+
+# Reply for each playback action on macOS
+_MAC_PLAYBACK_REPLIES = {
+    "play": "Playing on {app}",
+    "pause": "Paused {app}",
+    "playpause": "Toggled playback on {app}",
+    "next": "Skipped to next track",
+    "previous": "Went to previous track",
+}
+
+
+class _MacBackend(_Backend):
+    """AppleScript for the players, SwitchAudioSource for outputs."""
+
+    has_applescript = True
+
+    def __init__(self, default_app: str):
+        # Resolve tool paths once instead of searching PATH on every spawn
+        self._osascript = shutil.which("osascript") or "/usr/bin/osascript"
+        self._switch_audio = shutil.which("SwitchAudioSource")
+        # Compiled OSAScripts by source text (OSAKit only)
+        self._osa_cache: dict = {}
+        self._osa_lock = threading.Lock()
+        # Resident osascript used when OSAKit isn't installed
+        self._osa_helper = _AppleScriptHelper(self._osascript)
+        if OSAScript is not None:
+            # Compile up front so the first command doesn't pay for it
+            with self._osa_lock:
+                for (_, app), script in _SCRIPTS.items():
+                    if app == default_app:
+                        self._compile(script)
+                self._compile(_GET_VOLUME)
+                self._compile(_SET_VOLUME)
+
+    def run_script(self, script: str, *args: str) -> tuple[bool, str]:
+        if OSAScript is None:
+            with self._osa_lock:
+                result = self._osa_helper.run(script, args)
+            if result is not None:
+                return result
+            return _run_command([self._osascript, "-e", script, *args])
+
+        with self._osa_lock:
+            compiled, error = self._compile(script)
+            if compiled is None:
+                return False, error
+            if args:
+                result, error = compiled.executeAppleEvent_error_(_run_event(args), None)
+            else:
+                result, error = compiled.executeAndReturnError_(None)
+        if result is None:
+            return False, _osa_error(error)
+        return True, (result.stringValue() or "").strip()
+
+    def _compile(self, script: str):
+        """Compile a script with OSAKit, reusing earlier compiles. Returns (script, error)."""
+        compiled = self._osa_cache.get(script)
+        if compiled is not None:
+            return compiled, ""
+
+        compiled = OSAScript.alloc().initWithSource_(script)
+        ok, error = compiled.compileAndReturnError_(None)
+        if not ok:
+            return None, _osa_error(error)
+        self._osa_cache[script] = compiled
+        return compiled, ""
+
+    def playback(self, action: str, app: str) -> tuple[bool, str]:
+        success, output = self.run_action(action, app)
+        if success:
+            return True, _MAC_PLAYBACK_REPLIES[action].format(app=app)
+        return False, f"Error: {output}"
+
+    def current_output(self) -> Optional[str]:
+        if not self._switch_audio:
+            return None  # Can't switch without SwitchAudioSource
+        success, output = _run_command([self._switch_audio, "-c"])
+        return output if success else "Unknown"
+
+    def switch_output(self, device_name: str) -> tuple[bool, str]:
+        if not self._switch_audio:
+            return False, "SwitchAudioSource not installed"
+        return _run_command([self._switch_audio, "-s", device_name])
+
+    def get_volume(self) -> Optional[int]:
+        success, output = self.run_script(_GET_VOLUME)
+        if success:
+            try:
+                return int(output)
+            except ValueError:
+                return None
+        return None
+
+    def set_volume(self, level: int) -> tuple[bool, str]:
+        success, output = self.run_script(_SET_VOLUME, str(level))
+        if success:
+            return True, ""
+        return False, f"Error: {output}"
+
+    def adjust_volume(self, direction: str) -> str:
+        return "Error getting volume"
+
+    def open_url(self, url: str) -> bool:
+        success, output = _run_command(["open", url])
+        if not success:
+            log.warning("[Music] Couldn't open %s: %s", url, output)
+        return success
+
+
+# Media key, success reply and error reply for each playback action on Windows
+_WIN_PLAYBACK = {
+    "play": ("play", "Playing", "Error sending play command"),
+    "pause": ("pause", "Paused", "Error sending pause command"),
+    "playpause": ("play", "Toggled playback", "Error toggling playback"),
+    "next": ("next", "Skipped to next track", "Error skipping track"),
+    "previous": ("prev", "Went to previous track", "Error going to previous track"),
+}
+
+
+class _WinBackend(_Backend):
+    """Media keys for playback, Core Audio (or nircmd) for volume."""
+
+    def __init__(self):
+        # Default speaker's IAudioEndpointVolume (pycaw only)
+        self._endpoint = None
+
+    def _send_media_key(self, key: str) -> tuple[bool, str]:
+        """Send a media key. Keys: play, pause, next, prev"""
+        vk = _MEDIA_KEYS.get(key)
+        if not vk:
+            return False, f"Unknown media key: {key}"
+
+        inputs = _key_press(vk)
+        if _user32.SendInput(len(inputs), inputs, ctypes.sizeof(_INPUT)) != len(inputs):
+            return False, f"SendInput failed (error {ctypes.get_last_error()})"
+        return True, ""
+
+    def playback(self, action: str, app: str) -> tuple[bool, str]:
+        key, reply, error = _WIN_PLAYBACK[action]
+        success, _ = self._send_media_key(key)
+        return success, reply if success else error
+
+    def _get_endpoint(self):
+        """The speaker volume interface, activated on first use. None without pycaw."""
+        if self._endpoint is None and AudioUtilities is not None:
+            try:
+                interface = AudioUtilities.GetSpeakers().Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+                self._endpoint = ctypes.cast(interface, ctypes.POINTER(IAudioEndpointVolume))
+            except Exception as e:
+                log.warning("[Music] Core Audio volume unavailable: %s", e)
+        return self._endpoint
+
+    def get_volume(self) -> Optional[int]:
+        endpoint = self._get_endpoint()
+        if endpoint is None:
+            return None
+        return round(endpoint.GetMasterVolumeLevelScalar() * 100)
+
+    def set_volume(self, level: int) -> tuple[bool, str]:
+        endpoint = self._get_endpoint()
+        if endpoint is not None:
+            endpoint.SetMasterVolumeLevelScalar(level / 100, None)
+            return True, ""
+        # Without pycaw, fall back to nircmd if installed
+        # Scale 0-100 to 0-65535 for Windows
+        win_level = int(level * 65535 / 100)
+        success, _ = _run_command(["nircmd", "setsysvolume", str(win_level)])
+        if not success:
+            return False, "Volume control requires nircmd on Windows. Install from nirsoft.net"
+        return True, ""
+
+    def adjust_volume(self, direction: str) -> str:
+        # Without pycaw, use nircmd for volume adjustment
+        if direction == "up":
+            success, _ = _run_command(["nircmd", "changesysvolume", "10000"])
+        else:
+            success, _ = _run_command(["nircmd", "changesysvolume", "-10000"])
+        if success:
+            return f"Volume adjusted {direction}"
+        return "Volume control requires nircmd on Windows"
+
+    def open_url(self, url: str) -> bool:
+        # Values above 32 mean success
+        result = _shell32.ShellExecuteW(None, "open", url, None, None, SW_SHOWNORMAL)
+        if (result or 0) <= 32:
+            log.warning("[Music] Couldn't open %s (error %s)", url, result)
+            return False
+        return True
+
 
 class MusicController:
     """
@@ -28,181 +632,88 @@ class MusicController:
         """
         self.default_app = default_app
         self.music_speaker = music_speaker
-        print(f"[Music] Controller initialized (default: {default_app}, speaker: {music_speaker})")
-
-    def _run_command(self, cmd: list) -> tuple[bool, str]:
-        """Run a shell command and return (success, output)."""
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                return True, result.stdout.strip()
-            else:
-                return False, result.stderr.strip()
-        except subprocess.TimeoutExpired:
-            return False, "Command timed out"
-        except Exception as e:
-            return False, str(e)
-
-    def _switch_audio_output(self, device_name: str) -> bool:
-        """Switch system audio output to specified device."""
         if PLATFORM == "Darwin":
-            success, output = self._run_command(["SwitchAudioSource", "-s", device_name])
+            self.backend = _MacBackend(default_app)
         elif PLATFORM == "Windows":
-            # On Windows, audio device switching requires additional tools
-            # For now, we skip automatic switching - user sets default in Windows
-            print(f"[Music] Audio switching not implemented on Windows")
-            return True
+            self.backend = _WinBackend()
         else:
-            return False
+            self.backend = _Backend()
+        # Last known output device; None until we've asked or switched
+        self._current_output: Optional[str] = None
+        # Last player state we saw or caused ("playing", "paused", ...) and
+        # when; playback can be paused outside Alfred, so it goes stale
+        self._player_state: Optional[str] = None
+        self._player_state_time = 0.0
+        # (level, monotonic time) of the last system volume read or set
+        self._volume_cache: Optional[tuple[int, float]] = None
+        log.info("[Music] Controller initialized (default: %s, speaker: %s)", default_app, music_speaker)
 
+    def _switch_audio_output(self, device_name: str) -> bool:
+        """Switch system audio output to specified device."""
+        success, output = self.backend.switch_output(device_name)
         if success:
-            print(f"[Music] Switched audio to: {device_name}")
+            log.info("[Music] Switched audio to: %s", device_name)
+            self._current_output = device_name
             return True
         else:
-            print(f"[Music] Failed to switch audio: {output}")
+            log.warning("[Music] Failed to switch audio: %s", output)
             return False
 
-    def _get_current_output(self) -> str:
-        """Get current audio output device name."""
-        if PLATFORM == "Darwin":
-            success, output = self._run_command(["SwitchAudioSource", "-c"])
-            return output if success else "Unknown"
-        return "Default"
+    def output_changed(self, device_name: Optional[str] = None) -> None:
+        """Note an output switch made elsewhere. None means unknown, ask next time."""
+        self._current_output = device_name
+
+    def _set_player_state(self, state: Optional[str]) -> None:
+        self._player_state = state
+        self._player_state_time = time.monotonic()
+
+    def _recently_playing(self) -> bool:
+        """Whether we saw or started playback within PLAYER_STATE_TTL."""
+        return (
+            self._player_state == "playing"
+            and time.monotonic() - self._player_state_time < PLAYER_STATE_TTL
+        )
 
     def _ensure_music_speaker(self) -> None:
         """Switch to the music speaker if not already active."""
-        if PLATFORM != "Darwin":
-            return  # Skip on non-macOS
-        current = self._get_current_output()
-        if current != self.music_speaker:
+        # Trust the cached device; only ask when we don't know it
+        if self._current_output is None:
+            if self._recently_playing():
+                return  # Already audible where it's playing; leave the output alone
+            self._current_output = self.backend.current_output()
+            if self._current_output is None:
+                return  # No output switching on this platform
+        if self._current_output != self.music_speaker:
             self._switch_audio_output(self.music_speaker)
 
-    def _run_applescript(self, script: str) -> tuple[bool, str]:
-        """Run an AppleScript command and return (success, output). macOS only."""
-        if PLATFORM != "Darwin":
-            return False, "AppleScript not available on this platform"
-        return self._run_command(["osascript", "-e", script])
-
-    def _run_powershell(self, script: str) -> tuple[bool, str]:
-        """Run a PowerShell command and return (success, output). Windows only."""
-        if PLATFORM != "Windows":
-            return False, "PowerShell not available on this platform"
-        return self._run_command(["powershell", "-Command", script])
-
-    def _send_media_key(self, key: str) -> tuple[bool, str]:
-        """Send a media key on Windows. Keys: play, pause, next, prev"""
-        if PLATFORM != "Windows":
-            return False, "Media keys only on Windows"
-        # Use PowerShell to send media keys
-        key_map = {
-            "play": "0xB3",      # VK_MEDIA_PLAY_PAUSE
-            "pause": "0xB3",     # VK_MEDIA_PLAY_PAUSE
-            "next": "0xB0",      # VK_MEDIA_NEXT_TRACK
-            "prev": "0xB1",      # VK_MEDIA_PREV_TRACK
-        }
-        vk = key_map.get(key)
-        if not vk:
-            return False, f"Unknown media key: {key}"
-
-        ps_script = f'''
-        Add-Type -TypeDefinition '
-        using System;
-        using System.Runtime.InteropServices;
-        public class Keyboard {{
-            [DllImport("user32.dll")]
-            public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
-        }}
-        '
-        [Keyboard]::keybd_event({vk}, 0, 0, [UIntPtr]::Zero)
-        [Keyboard]::keybd_event({vk}, 0, 2, [UIntPtr]::Zero)
-        '''
-        return self._run_powershell(ps_script)
-
     def play(self, app: str = None) -> str:
         """Start or resume playback."""
         app = app or self.default_app
         self._ensure_music_speaker()
-
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript(f'tell application "{app}" to play')
-            if success:
-                return f"Playing on {app}"
-            return f"Error: {output}"
-        elif PLATFORM == "Windows":
-            success, _ = self._send_media_key("play")
-            if success:
-                return "Playing"
-            return "Error sending play command"
-        return "Playback control not available on this platform"
+        success, reply = self.backend.playback("play", app)
+        if success:
+            self._set_player_state("playing")
+        return reply
 
     def pause(self, app: str = None) -> str:
         """Pause playback."""
-        app = app or self.default_app
-
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript(f'tell application "{app}" to pause')
-            if success:
-                return f"Paused {app}"
-            return f"Error: {output}"
-        elif PLATFORM == "Windows":
-            success, _ = self._send_media_key("pause")
-            if success:
-                return "Paused"
-            return "Error sending pause command"
-        return "Playback control not available on this platform"
+        success, reply = self.backend.playback("pause", app or self.default_app)
+        if success:
+            self._set_player_state("paused")
+        return reply
 
     def toggle_playback(self, app: str = None) -> str:
         """Toggle play/pause."""
-        app = app or self.default_app
-
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript(f'tell application "{app}" to playpause')
-            if success:
-                return f"Toggled playback on {app}"
-            return f"Error: {output}"
-        elif PLATFORM == "Windows":
-            success, _ = self._send_media_key("play")
-            if success:
-                return "Toggled playback"
-            return "Error toggling playback"
-        return "Playback control not available on this platform"
+        self._set_player_state(None)  # Could go either way
+        return self.backend.playback("playpause", app or self.default_app)[1]
 
     def next_track(self, app: str = None) -> str:
         """Skip to next track."""
-        app = app or self.default_app
-
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript(f'tell application "{app}" to next track')
-            if success:
-                return "Skipped to next track"
-            return f"Error: {output}"
-        elif PLATFORM == "Windows":
-            success, _ = self._send_media_key("next")
-            if success:
-                return "Skipped to next track"
-            return "Error skipping track"
-        return "Playback control not available on this platform"
+        return self.backend.playback("next", app or self.default_app)[1]
 
     def previous_track(self, app: str = None) -> str:
         """Go to previous track."""
-        app = app or self.default_app
-
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript(f'tell application "{app}" to previous track')
-            if success:
-                return "Went to previous track"
-            return f"Error: {output}"
-        elif PLATFORM == "Windows":
-            success, _ = self._send_media_key("prev")
-            if success:
-                return "Went to previous track"
-            return "Error going to previous track"
-        return "Playback control not available on this platform"
+        return self.backend.playback("previous", app or self.default_app)[1]
 
     def set_volume(self, level: int, app: str = None) -> str:
         """
@@ -210,82 +721,47 @@ class MusicController:
         This controls the actual speaker output, not the app's internal volume.
         """
         level = max(0, min(100, level))
-
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript(f'set volume output volume {level}')
-        elif PLATFORM == "Windows":
-            # Use PowerShell to set volume (requires audio cmdlet or nircmd)
-            # Scale 0-100 to 0-65535 for Windows
-            win_level = int(level * 65535 / 100)
-            ps_script = f'''
-            $obj = New-Object -ComObject WScript.Shell
-            1..50 | ForEach-Object {{ $obj.SendKeys([char]174) }}
-            1..{level // 2} | ForEach-Object {{ $obj.SendKeys([char]175) }}
-            '''
-            # Simpler approach: just report success, actual control via nircmd if installed
-            success, output = self._run_command(["nircmd", "setsysvolume", str(win_level)])
-            if not success:
-                return f"Volume control requires nircmd on Windows. Install from nirsoft.net"
-        else:
-            return "Volume control not available on this platform"
-
-        if success:
-            return f"System volume set to {level}%"
-        return f"Error: {output}"
+        success, error = self.backend.set_volume(level)
+        if not success:
+            return error
+        self._remember_volume(level)
+        return f"System volume set to {level}%"
 
     def adjust_volume(self, direction: str) -> str:
         """
         Adjust system volume up or down by ~15%.
         direction: 'up' or 'down'
         """
-        if PLATFORM == "Darwin":
-            # Get current volume
-            success, output = self._run_applescript('output volume of (get volume settings)')
-            if not success:
-                return f"Error getting volume: {output}"
-            try:
-                current = int(output)
-            except ValueError:
-                return f"Error parsing volume: {output}"
+        current = self.get_volume_level()
+        if current is None:
+            # Can't read the level; step it blind if the platform can
+            self._volume_cache = None
+            return self.backend.adjust_volume(direction)
 
-            # Adjust by 15%
-            if direction == "up":
-                new_level = min(100, current + 15)
-            else:
-                new_level = max(0, current - 15)
-            return self.set_volume(new_level)
-
-        elif PLATFORM == "Windows":
-            # Use nircmd for volume adjustment
-            if direction == "up":
-                success, output = self._run_command(["nircmd", "changesysvolume", "10000"])
-            else:
-                success, output = self._run_command(["nircmd", "changesysvolume", "-10000"])
-            if success:
-                return f"Volume adjusted {direction}"
-            return f"Volume control requires nircmd on Windows"
-
-        return "Volume control not available on this platform"
+        # Adjust by 15%
+        step = 15 if direction == "up" else -15
+        return self.set_volume(current + step)
 
     def get_volume(self, app: str = None) -> str:
         """Get current SYSTEM volume level."""
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript('output volume of (get volume settings)')
-            if success:
-                return f"System volume is at {output}%"
-            return f"Error: {output}"
-        return "Volume query not available on this platform"
+        level = self.get_volume_level()
+        if level is None:
+            return "Could not read the system volume"
+        return f"System volume is at {level}%"
+
+    def _remember_volume(self, level: int) -> None:
+        self._volume_cache = (level, time.monotonic())
 
     def get_volume_level(self) -> Optional[int]:
         """Get current system volume as an integer (0-100), or None on error."""
-        if PLATFORM == "Darwin":
-            success, output = self._run_applescript('output volume of (get volume settings)')
-            if success:
-                try:
-                    return int(output)
-                except ValueError:
-                    return None
-        return None
+        cached = self._volume_cache
+        if cached is not None and time.monotonic() - cached[1] < VOLUME_CACHE_TTL:
+            return cached[0]
+
+        level = self.backend.get_volume()
+        if level is not None:
+            self._remember_volume(level)
+        return level
 
     def duck(self, duck_level: int = 15) -> Optional[int]:
         """
@@ -294,73 +770,41 @@ class MusicController:
         """
         original = self.get_volume_level()
         if original is not None and original > duck_level:
-            self._run_applescript(f'set volume output volume {duck_level}')
-            print(f"[Music] Ducked volume: {original}% -> {duck_level}%")
+            success, _ = self.backend.set_volume(duck_level)
+            if success:
+                self._remember_volume(duck_level)
+            log.debug("[Music] Ducked volume: %d%% -> %d%%", original, duck_level)
         return original
 
     def restore(self, original_volume: Optional[int]) -> None:
         """Restore volume to the original level after ducking."""
         if original_volume is not None:
-            self._run_applescript(f'set volume output volume {original_volume}')
-            print(f"[Music] Restored volume to {original_volume}%")
+            success, _ = self.backend.set_volume(original_volume)
+            if success:
+                self._remember_volume(original_volume)
+            log.debug("[Music] Restored volume to %d%%", original_volume)
 
     def get_current_track(self, app: str = None) -> str:
         """Get info about the currently playing track."""
-        if PLATFORM != "Darwin":
+        if not self.backend.has_applescript:
             return "Track info not available on this platform"
 
         app = app or self.default_app
 
-        if app == "Music":
-            script = '''
-            tell application "Music"
-                if player state is playing then
-                    set trackName to name of current track
-                    set artistName to artist of current track
-                    set albumName to album of current track
-                    return trackName & " by " & artistName & " from " & albumName
-                else if player state is paused then
-                    set trackName to name of current track
-                    set artistName to artist of current track
-                    return trackName & " by " & artistName & " (paused)"
-                else
-                    return "Nothing playing"
-                end if
-            end tell
-            '''
-        else:  # Spotify
-            script = '''
-            tell application "Spotify"
-                if player state is playing then
-                    set trackName to name of current track
-                    set artistName to artist of current track
-                    set albumName to album of current track
-                    return trackName & " by " & artistName & " from " & albumName
-                else if player state is paused then
-                    set trackName to name of current track
-                    set artistName to artist of current track
-                    return trackName & " by " & artistName & " (paused)"
-                else
-                    return "Nothing playing"
-                end if
-            end tell
-            '''
-
-        success, output = self._run_applescript(script)
+        success, output = self.backend.run_action("track", app)
         if success:
             return output
         return f"Error: {output}"
 
     def get_player_state(self, app: str = None) -> str:
         """Get the current player state (playing, paused, stopped)."""
-        if PLATFORM != "Darwin":
+        if not self.backend.has_applescript:
             return "Unknown"
 
         app = app or self.default_app
-        success, output = self._run_applescript(
-            f'tell application "{app}" to get player state as string'
-        )
+        success, output = self.backend.run_action("state", app)
         if success:
+            self._set_player_state(output)
             return output
         return f"Error: {output}"
 
@@ -370,79 +814,38 @@ class MusicController:
         macOS: Apple Music searches local library, Spotify uses URI scheme.
         Windows: Uses Spotify URI scheme.
         """
-        import urllib.parse
-
         app = app or self.default_app
         self._ensure_music_speaker()
 
         # Spotify URI scheme works on both platforms
-        if app == "Spotify" or PLATFORM == "Windows":
+        if app == "Spotify" or not self.backend.has_applescript:
             encoded_query = urllib.parse.quote(query)
+            if self.backend.open_url(f"spotify:search:{encoded_query}"):
+                return f"Searching for '{query}' on Spotify"
+            return "Music search not available on this platform"
 
-            if PLATFORM == "Darwin":
-                self._run_command(["open", f"spotify:search:{encoded_query}"])
-            elif PLATFORM == "Windows":
-                # Use cmd /c start to open URI on Windows
-                subprocess.run(f'start spotify:search:{encoded_query}', shell=True)
-
-            return f"Searching for '{query}' on Spotify"
-
-        elif PLATFORM == "Darwin" and app == "Music":
-            # Search Apple Music library and play first match
-            script = f'''
-            tell application "Music"
-                set searchResults to search playlist "Library" for "{query}"
-                if searchResults is not {{}} then
-                    play item 1 of searchResults
-                    set trackName to name of current track
-                    set artistName to artist of current track
-                    return "Playing " & trackName & " by " & artistName
-                else
-                    return "No results found for {query}"
-                end if
-            end tell
-            '''
-            success, output = self._run_applescript(script)
-            if success:
-                return output
-            return f"Error searching for '{query}': {output}"
-
-        return "Music search not available on this platform"
+        # Search Apple Music library and play first match
+        success, output = self.backend.run_action("search", app, query)
+        if success:
+            self._set_player_state(None if output.startswith("No results") else "playing")
+            return output
+        return f"Error searching for '{query}': {output}"
 
     def play_playlist(self, playlist_name: str, app: str = None) -> str:
         """Play a playlist by name."""
         app = app or self.default_app
         self._ensure_music_speaker()
 
-        if app == "Music":
-            script = f'''
-            tell application "Music"
-                play playlist "{playlist_name}"
-                return "Playing playlist: {playlist_name}"
-            end tell
-            '''
-        else:  # Spotify
-            script = f'''
-            tell application "Spotify"
-                set targetPlaylist to "{playlist_name}"
-                -- Spotify AppleScript is more limited, try to play by name
-                play track targetPlaylist
-                return "Playing: {playlist_name}"
-            end tell
-            '''
-
-        success, output = self._run_applescript(script)
+        success, output = self.backend.run_action("playlist", app, playlist_name)
         if success:
+            self._set_player_state("playing")
             return output
         return f"Error playing playlist '{playlist_name}': {output}"
 
     def shuffle(self, enabled: bool = True, app: str = None) -> str:
         """Enable or disable shuffle."""
         app = app or self.default_app
-        value = "true" if enabled else "false"
-        success, output = self._run_applescript(
-            f'tell application "{app}" to set shuffling to {value}'
-        )
+        success, output = self.backend.run_action("shuffle_on" if enabled else "shuffle_off", app)
         if success:
             state = "on" if enabled else "off"
             return f"Shuffle {state}"
@@ -455,18 +858,9 @@ class MusicController:
         """
         app = app or self.default_app
 
-        if app == "Music":
-            mode_map = {"off": "off", "one": "one", "all": "all"}
-            apple_mode = mode_map.get(mode, "off")
-            success, output = self._run_applescript(
-                f'tell application "Music" to set song repeat to {apple_mode}'
-            )
-        else:  # Spotify
-            # Spotify uses true/false for repeating
-            value = "true" if mode != "off" else "false"
-            success, output = self._run_applescript(
-                f'tell application "Spotify" to set repeating to {value}'
-            )
+        if mode not in ("off", "one", "all"):
+            mode = "off"
+        success, output = self.backend.run_action(f"repeat_{mode}", app)
 
         if success:
             return f"Repeat set to {mode}"
@@ -476,10 +870,20 @@ class MusicController:
         """Get full playback status."""
         app = app or self.default_app
 
+        if self.backend.has_applescript:
+            success, output = self.backend.run_action("status", app)
+            if success:
+                # Track names may contain "|", so take state and volume off the ends
+                state, _, rest = output.partition("|")
+                track, _, volume = rest.rpartition("|")
+                self._set_player_state(state)
+                return f"Status: {state}\nTrack: {track}\nSystem volume is at {volume}%"
+
+        # No combined query (or it failed part way): ask for each piece
+        # separately, so one failure doesn't hide the rest
         state = self.get_player_state(app)
         track = self.get_current_track(app)
         volume = self.get_volume(app)
-
         return f"Status: {state}\nTrack: {track}\n{volume}"
 
 
@@ -6,18 +6,63 @@ The platform that powers intelligent agents in your home.
 Currently running: Alfred (door greeter + voice assistant)
 """
 
+import logging
+import logging.handlers
+import queue
 import signal
 import sys
-import time
+import threading
+from functools import cached_property
 
 from sensors import DoorSensor
 from context import ContextGatherer
 from personality import GreetingGenerator
 from voice import TextToSpeech, Speaker, VoiceListener
+from voice.tts import iter_sentences, prefetch
 from agents.alfred import AlfredAgent
 from config import config
 
 
+class locked_cached_property(cached_property):
+    """
+    cached_property that builds its value under a lock, so threads that hit
+    it first at the same time share one instance (cached_property itself
+    stopped locking in Python 3.12).
+    """
+
+    def __init__(self, func):
+        super().__init__(func)
+        self._build_lock = threading.Lock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self._build_lock:
+            return super().__get__(instance, owner)
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route the "reality" loggers through a queue so log calls on the voice
+    path never wait on a console write. Returns the running listener.
+    """
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, console)
+
+    logger = logging.getLogger("reality")
+    level = logging.getLevelName(config.LOG_LEVEL)
+    logger.setLevel(level if isinstance(level, int) else logging.INFO)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+
+    listener.start()
+    if not isinstance(level, int):
+        logger.warning("[Reality] Unknown LOG_LEVEL %r, using INFO", config.LOG_LEVEL)
+    return listener
+
+
 class Reality:
     """The Reality home system."""
 
@@ -30,14 +75,17 @@ class Reality:
         # Initialize components
         print("[Reality] Initializing system...")
 
-        # Core components
-        self.tts = TextToSpeech()
-        self.speaker = Speaker()
+        # Speech and greetings are built lazily, but a missing key should
+        # still stop startup here with a configuration error
+        TextToSpeech.check_config()
+        GreetingGenerator.check_config()
 
-        # Door sensor components
+        # Door sensor (speech, context and greeting components are built on first use)
         self.door_sensor = DoorSensor()
-        self.context_gatherer = ContextGatherer()
-        self.greeting_generator = GreetingGenerator()
+        self._stop_event = threading.Event()
+        # Door events are handled off the MQTT thread, one at a time
+        self._door_events = queue.SimpleQueue()
+        self._door_thread = threading.Thread(target=self._door_worker, name="door-events", daemon=True)
 
         # Voice conversation components (optional - needs OpenAI key)
         self.voice_enabled = False
@@ -48,7 +96,7 @@ class Reality:
                 self.listener = VoiceListener()
                 # Give Alfred access to home context (door events, etc.)
                 self.alfred_agent = AlfredAgent(
-                    home_context_provider=self.context_gatherer.presence.get_home_context
+                    home_context_provider=lambda: self.context_gatherer.presence.get_home_context()
                 )
                 self.voice_enabled = True
                 print("[Reality] Voice conversation enabled")
@@ -64,7 +112,43 @@ class Reality:
             print("  - Alfred (voice assistant) - say 'Alfred' to talk")
         print()
 
+    @locked_cached_property
+    def tts(self) -> TextToSpeech:
+        return TextToSpeech()
+
+    @locked_cached_property
+    def speaker(self) -> Speaker:
+        return Speaker()
+
+    @locked_cached_property
+    def context_gatherer(self) -> ContextGatherer:
+        return ContextGatherer()
+
+    @locked_cached_property
+    def greeting_generator(self) -> GreetingGenerator:
+        return GreetingGenerator()
+
+    def _warm_components(self):
+        """Build the lazy components ahead of the first greeting or reply."""
+        for name in ("context_gatherer", "greeting_generator", "tts", "speaker"):
+            try:
+                getattr(self, name)
+            except Exception as e:
+                print(f"[Reality] Could not initialize {name}: {e}")
+
     def on_door_opened(self, event: dict):
+        """Queue a door opened event. Called on the MQTT network thread, so it mustn't block."""
+        self._door_events.put(event)
+
+    def _door_worker(self):
+        while True:
+            event = self._door_events.get()
+            try:
+                self._greet(event)
+            except Exception as e:
+                print(f"[Reality] Error handling door event: {e}")
+
+    def _greet(self, event: dict):
         """Handle door opened event."""
         print("\n" + "-" * 40)
         print("[Reality] Door opened")
@@ -84,13 +168,8 @@ class Reality:
             print("-" * 40 + "\n")
             return
 
-        # Speak it
-        audio = self.tts.synthesize(greeting)
-        if not audio:
-            print("[Reality] Failed to synthesize speech")
-            return
-
-        self.speaker.play(audio)
+        # Speak it, starting playback as soon as the first audio arrives
+        self.speaker.play_stream(self.tts.synthesize_stream(greeting))
 
         print("-" * 40 + "\n")
 
@@ -99,22 +178,47 @@ class Reality:
         print("\n" + "-" * 40)
         print(f"[Reality] Voice command: {command}")
 
-        # Get response from Alfred
-        response = self.alfred_agent.respond(command)
-        if not response:
-            print("[Alfred] No response")
-            print("-" * 40 + "\n")
-            return
+        # Speak Alfred's response sentence by sentence as it streams in.
+        # Each sentence starts synthesizing as soon as it's complete and a
+        # player thread speaks them in order, so upcoming audio is fetched
+        # while the current sentence plays. The small queue keeps synthesis
+        # only a couple of sentences ahead.
+        playback: queue.Queue = queue.Queue(maxsize=1)
+        player = threading.Thread(target=self._play_all, args=(playback,), name="voice-playback")
+        player.start()
+        spoke = False
+        try:
+            for sentence in iter_sentences(self.alfred_agent.respond_stream(command)):
+                spoke = True
+                playback.put(prefetch(self.tts.synthesize_stream(sentence)))
+        finally:
+            playback.put(None)
+            player.join()
 
-        # Stream TTS
-        audio_stream = self.tts.synthesize_stream(response)
-        self.speaker.play_stream(audio_stream)
+        if not spoke:
+            print("[Alfred] No response")
         print("-" * 40 + "\n")
 
+    def _play_all(self, playback: queue.Queue):
+        """
+        Play queued audio streams in order until None. A failed sentence is
+        skipped rather than ending the thread, which would leave the
+        producer blocked on the full queue.
+        """
+        for audio_stream in iter(playback.get, None):
+            try:
+                self.speaker.play_stream(audio_stream)
+            except Exception as e:
+                print(f"[Reality] Playback error: {e}")
+
     def run(self):
         """Start Reality and listen for events."""
+        # Build the speech and greeting components off the event path
+        threading.Thread(target=self._warm_components, name="warm-components", daemon=True).start()
+
         # Start door sensor
         print("[Reality] Starting door sensor...")
+        self._door_thread.start()
         self.door_sensor.start(self.on_door_opened)
 
         # Start voice listener if enabled
@@ -126,22 +230,27 @@ class Reality:
 
         # Handle graceful shutdown
         def shutdown(sig, frame):
-            print("\n[Reality] Shutting down...")
-            self.door_sensor.stop()
-            if self.listener:
-                self.listener.stop()
-            sys.exit(0)
+            self._stop_event.set()
 
         signal.signal(signal.SIGINT, shutdown)
         signal.signal(signal.SIGTERM, shutdown)
 
-        # Keep running
-        while True:
-            time.sleep(1)
+        # Sleep until a signal asks us to stop. Wait in short slices - an
+        # untimed wait can't be interrupted by Ctrl+C on Windows
+        while not self._stop_event.wait(1.0):
+            pass
+
+        print("\n[Reality] Shutting down...")
+        self.door_sensor.stop()
+        if self.listener:
+            self.listener.stop()
+        if self.alfred_agent:
+            self.alfred_agent.close()
 
 
 def main():
     """Entry point."""
+    log_listener = setup_logging()
     try:
         reality = Reality()
         reality.run()
@@ -154,6 +263,8 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        log_listener.stop()  # Flush queued log records
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+"""
+Batch jobs - runs non-interactive Claude requests through the Message Batches API.
+Batched requests cost half as much as realtime ones and can take a while to
+finish, so they're only used for background work like conversation summaries.
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import anthropic
+
+
+log = logging.getLogger("reality.batch_jobs")
+
+# Flush buffered requests at most this often (seconds)
+FLUSH_INTERVAL = 300
+
+# How often to check on submitted batches (seconds)
+POLL_INTERVAL = 60
+
+
+class BatchJobQueue:
+    """
+    Buffers {custom_id, params} requests and submits them as message batches.
+    A poller thread waits for each batch to end and hands every successful
+    result to on_result(custom_id, message, meta), where meta is whatever
+    was passed to enqueue. Buffered requests, pending batch ids and request
+    metadata are persisted so nothing is lost across restarts.
+    """
+
+    def __init__(
+        self,
+        client: anthropic.Anthropic,
+        on_result: Callable[[str, object, Dict], None],
+        state_file: str = "pending_batches.json",
+    ):
+        self.client = client
+        self.on_result = on_result
+        self.state_file = Path(__file__).parent.parent / "data" / state_file
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._last_flush = time.monotonic()
+        self._load()
+
+        self._thread = threading.Thread(target=self._poll_loop, name="batch-jobs", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        """Load buffered requests and pending batch ids from disk."""
+        self._buffer: List[Dict] = []
+        self._batches: List[str] = []
+        self._meta: Dict[str, Dict] = {}        # custom_id -> metadata, until its result lands
+        self._rejected: List[Dict] = []         # Requests the API refused, kept for inspection
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, "r") as f:
+                    data = json.load(f)
+                self._buffer = data.get("buffered", [])
+                self._batches = data.get("batches", [])
+                self._meta = data.get("meta", {})
+                self._rejected = data.get("rejected", [])
+            except Exception as e:
+                log.warning("[BatchJobs] Error loading: %s", e)
+
+    def _save(self):
+        """Persist queue state to disk. Caller holds the lock."""
+        with open(self.state_file, "w") as f:
+            json.dump({
+                "buffered": self._buffer,
+                "batches": self._batches,
+                "meta": self._meta,
+                "rejected": self._rejected,
+            }, f, indent=2)
+
+    def enqueue(self, custom_id: str, params: Dict, meta: Optional[Dict] = None):
+        """
+        Buffer a request. It's submitted on the next flush. custom_id must be
+        unique among pending requests; meta is handed back with the result.
+        """
+        with self._lock:
+            self._buffer.append({"custom_id": custom_id, "params": params})
+            self._meta[custom_id] = meta or {}
+            self._save()
+
+    def flush(self):
+        """Submit all buffered requests as one batch."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._buffer:
+                return
+            try:
+                batch = self.client.messages.batches.create(requests=self._buffer)
+            except anthropic.APIStatusError as e:
+                if e.status_code == 429 or e.status_code >= 500:
+                    log.warning("[BatchJobs] Submit error, will retry: %s", e)
+                    return
+                # The batch itself was refused - retrying it would fail forever
+                log.error("[BatchJobs] Batch rejected, setting %d requests aside: %s", len(self._buffer), e)
+                self._rejected.extend(self._buffer)
+                for request in self._buffer:
+                    self._meta.pop(request["custom_id"], None)
+                self._buffer = []
+                self._save()
+                return
+            except Exception as e:
+                log.warning("[BatchJobs] Submit error, will retry: %s", e)
+                return
+            log.info("[BatchJobs] Submitted batch %s (%d requests)", batch.id, len(self._buffer))
+            self._batches.append(batch.id)
+            self._buffer = []
+            self._save()
+
+    def _collect(self, batch_id: str) -> bool:
+        """Deliver the results of a batch if it has ended. Returns True when done with it."""
+        batch = self.client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return False
+
+        for entry in self.client.messages.batches.results(batch_id):
+            with self._lock:
+                meta = self._meta.pop(entry.custom_id, {})
+            if entry.result.type != "succeeded":
+                log.warning("[BatchJobs] Request %s %s", entry.custom_id, entry.result.type)
+                continue
+            try:
+                self.on_result(entry.custom_id, entry.result.message, meta)
+            except Exception as e:
+                log.error("[BatchJobs] Error handling %s: %s", entry.custom_id, e)
+        return True
+
+    def poll(self):
+        """Flush if due, then collect any batches that have ended."""
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+        for batch_id in list(self._batches):
+            try:
+                done = self._collect(batch_id)
+            except Exception as e:
+                log.warning("[BatchJobs] Poll error for %s: %s", batch_id, e)
+                continue
+            if done:
+                with self._lock:
+                    self._batches.remove(batch_id)
+                    self._save()
+
+    def _poll_loop(self):
+        while not self._stop_event.wait(POLL_INTERVAL):
+            self.poll()
+
+    def close(self):
+        """Stop polling and submit anything still buffered. Pending batches resume next start."""
+        self._stop_event.set()
+        self.flush()
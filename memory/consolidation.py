@@ -17,6 +17,25 @@ from memory.conversation_store import get_conversation_store
 # How often to run consolidation
 CONSOLIDATION_INTERVAL_HOURS = 24
 
+# Fixed instructions, sent as a cached system block ahead of the gathered context
+CONSOLIDATE_INSTRUCTIONS = """You are Alfred, a butler AI who has been observing and conversing with someone.
+Based on everything you know (given in the user message), synthesize your understanding.
+
+Respond in JSON format with these fields:
+{
+  "personality_sketch": "A 2-3 sentence description of who this person seems to be - their character, tendencies, what matters to them.",
+  "current_situation": "A brief note on what they seem focused on currently (or null if unclear).",
+  "communication_notes": "How they prefer to communicate - brief observations (or null if unknown).",
+  "themes": ["List of 2-4 recurring themes or interests you've noticed"],
+  "open_questions": ["List of 2-3 things you're still curious about or unsure of"]
+}
+
+Be concise and insightful. Only include what you can reasonably infer - don't make things up."""
+
+CONSOLIDATE_SYSTEM = [
+    {"type": "text", "text": CONSOLIDATE_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+]
+
 
 class MemoryConsolidator:
     """
@@ -27,6 +46,7 @@ class MemoryConsolidator:
     def __init__(self, understanding_file: str = "understanding.json"):
         self.understanding_file = Path(__file__).parent.parent / "data" / understanding_file
         self.understanding_file.parent.mkdir(parents=True, exist_ok=True)
+        self._version = 0  # Bumped on every write
         self._load()
 
     def _load(self):
@@ -55,9 +75,14 @@ class MemoryConsolidator:
 
     def _save(self):
         """Persist understanding to disk."""
+        self._version += 1
         with open(self.understanding_file, "w") as f:
             json.dump(self._data, f, indent=2)
 
+    def version(self) -> int:
+        """Monotonic write counter - lets callers cache derived context."""
+        return self._version
+
     def needs_consolidation(self) -> bool:
         """Check if enough time has passed since last consolidation."""
         last = self._data.get("last_consolidated")
@@ -170,24 +195,8 @@ class MemoryConsolidator:
                 model="claude-3-5-haiku-20241022",  # Fast and cheap for synthesis
                 max_tokens=800,
                 temperature=0.3,
-                messages=[{
-                    "role": "user",
-                    "content": f"""You are Alfred, a butler AI who has been observing and conversing with someone.
-Based on everything you know, synthesize your understanding.
-
-{context_str}
-
-Respond in JSON format with these fields:
-{{
-  "personality_sketch": "A 2-3 sentence description of who this person seems to be - their character, tendencies, what matters to them.",
-  "current_situation": "A brief note on what they seem focused on currently (or null if unclear).",
-  "communication_notes": "How they prefer to communicate - brief observations (or null if unknown).",
-  "themes": ["List of 2-4 recurring themes or interests you've noticed"],
-  "open_questions": ["List of 2-3 things you're still curious about or unsure of"]
-}}
-
-Be concise and insightful. Only include what you can reasonably infer - don't make things up."""
-                }]
+                system=CONSOLIDATE_SYSTEM,
+                messages=[{"role": "user", "content": context_str}],
             )
 
             result_text = response.content[0].text.strip()
@@ -4,6 +4,9 @@ Uses Claude to summarize and extract facts after conversations end.
 """
 
 import json
+import threading
+import time
+import uuid
 import anthropic
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -12,12 +15,12 @@ from typing import Optional, List, Dict
 from config import config
 from memory.user_profile import get_user_profile
 from memory.relationships import get_relationship_graph
+from memory.batch_jobs import BatchJobQueue
 
 
-SUMMARIZE_PROMPT = """Summarize this conversation between Alfred (an AI butler) and the user.
-
-Conversation:
-{conversation}
+# Fixed instructions, sent as a cached system block; only the conversation
+# itself changes from one summary to the next
+SUMMARIZE_INSTRUCTIONS = """Summarize the conversation between Alfred (an AI butler) and the user that follows.
 
 Provide a JSON response with:
 1. "summary": A 1-2 sentence summary of what was discussed
@@ -35,6 +38,27 @@ Only include people_mentioned if people were actually mentioned. Do not include
 
 Respond ONLY with valid JSON, no other text."""
 
+SUMMARIZE_SYSTEM = [
+    {"type": "text", "text": SUMMARIZE_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+]
+
+# Cosine similarity above which a past conversation's summary is reused
+SIMILARITY_THRESHOLD = 0.92
+
+# Summary fields that can be reused from a similar conversation. Facts and
+# people belong to the conversation they were learned in, so a cache hit
+# never re-applies them
+REUSABLE_SUMMARY_FIELDS = ("summary", "topics", "mood")
+
+
+def _format_conversation(messages: List[Dict]) -> str:
+    """Render messages as the transcript that gets summarized."""
+    lines = []
+    for msg in messages:
+        role = "User" if msg["role"] == "user" else "Alfred"
+        lines.append(f"{role}: {msg['content']}\n")
+    return "".join(lines)
+
 
 class ConversationStore:
     """
@@ -44,6 +68,9 @@ class ConversationStore:
     def __init__(self, store_file: str = "conversations.json"):
         self.store_file = Path(__file__).parent.parent / "data" / store_file
         self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        self._version = 0  # Bumped on every write
+        # Summaries are applied from both the caller's thread and the batch poller
+        self._lock = threading.Lock()
         self._load()
 
         if config.ANTHROPIC_API_KEY:
@@ -51,6 +78,18 @@ class ConversationStore:
         else:
             self.client = None
 
+        # Summaries go through the (cheaper, slower) batch API when enabled
+        self._batch_queue = None
+        if self.client and config.ANTHROPIC_BATCH_SUMMARIES:
+            self._batch_queue = BatchJobQueue(self.client, self._on_batch_result)
+
+        # Near-identical conversations reuse an earlier summary (embeddings via OpenAI)
+        self.similarity_threshold = SIMILARITY_THRESHOLD
+        self._summary_cache = None
+        if self.client and config.SUMMARY_CACHE and config.OPENAI_API_KEY:
+            from memory.summary_cache import SummaryCache  # numpy + openai, only when enabled
+            self._summary_cache = SummaryCache()
+
     def _load(self):
         """Load conversation history from disk."""
         if self.store_file.exists():
@@ -72,6 +111,7 @@ class ConversationStore:
 
     def _save(self):
         """Persist store to disk."""
+        self._version += 1
         # Keep only last 30 days of conversations
         cutoff = (datetime.now() - timedelta(days=30)).isoformat()
         self._data["conversations"] = [
@@ -82,6 +122,44 @@ class ConversationStore:
         with open(self.store_file, "w") as f:
             json.dump(self._data, f, indent=2)
 
+    def version(self) -> int:
+        """Monotonic write counter - lets callers cache derived context."""
+        return self._version
+
+    def _summary_params(self, conversation_text: str) -> Dict:
+        """Build the Claude request that summarizes a conversation."""
+        return {
+            "model": "claude-3-5-sonnet-20241022",  # Good balance of quality and cost
+            "max_tokens": 1000,
+            "temperature": 0,
+            "system": SUMMARIZE_SYSTEM,
+            "messages": [{
+                "role": "user",
+                "content": f"Conversation:\n{conversation_text}"
+            }],
+        }
+
+    def _parse_summary(self, response, when: datetime) -> Dict:
+        """Turn a summarization response into a summary dict."""
+        result_text = response.content[0].text.strip()
+
+        # Parse JSON response
+        # Handle potential markdown code blocks
+        if result_text.startswith("```"):
+            result_text = result_text.split("```")[1]
+            if result_text.startswith("json"):
+                result_text = result_text[4:]
+
+        result = json.loads(result_text)
+
+        return {
+            "date": when.isoformat(),
+            "summary": result.get("summary", ""),
+            "topics": result.get("topics", []),
+            "facts_learned": result.get("facts_learned", []),
+            "mood": result.get("mood", "neutral"),
+        }
+
     def summarize_conversation(self, messages: List[Dict]) -> Optional[Dict]:
         """
         Summarize a conversation and extract facts.
@@ -98,55 +176,67 @@ class ConversationStore:
         if len(messages) < 2:
             return None  # Too short to summarize
 
-        # Format conversation for summarization
-        conversation_text = ""
-        for msg in messages:
-            role = "User" if msg["role"] == "user" else "Alfred"
-            conversation_text += f"{role}: {msg['content']}\n"
+        conversation_text = _format_conversation(messages)
+
+        embedding = None
+        if self._summary_cache:
+            embedding = self._summary_cache.embed(conversation_text)
+            if embedding is not None:
+                cached = self._summary_cache.lookup(embedding, self.similarity_threshold)
+                if cached:
+                    print("[ConversationStore] Reusing summary of a similar conversation")
+                    return {
+                        "date": datetime.now().isoformat(),
+                        "summary": cached.get("summary", ""),
+                        "topics": cached.get("topics", []),
+                        "facts_learned": [],
+                        "mood": cached.get("mood", "neutral"),
+                    }
 
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",  # Good balance of quality and cost
-                max_tokens=1000,
-                temperature=0,
-                messages=[{
-                    "role": "user",
-                    "content": SUMMARIZE_PROMPT.format(conversation=conversation_text)
-                }]
-            )
-
-            result_text = response.content[0].text.strip()
-
-            # Parse JSON response
-            # Handle potential markdown code blocks
-            if result_text.startswith("```"):
-                result_text = result_text.split("```")[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-
-            result = json.loads(result_text)
-
-            return {
-                "date": datetime.now().isoformat(),
-                "summary": result.get("summary", ""),
-                "topics": result.get("topics", []),
-                "facts_learned": result.get("facts_learned", []),
-                "mood": result.get("mood", "neutral"),
-            }
+            response = self.client.messages.create(**self._summary_params(conversation_text))
+            summary = self._parse_summary(response, datetime.now())
 
         except Exception as e:
             print(f"[ConversationStore] Summarization error: {e}")
             return None
 
+        if embedding is not None:
+            self._summary_cache.add(embedding, {k: summary[k] for k in REUSABLE_SUMMARY_FIELDS})
+        return summary
+
     def store_conversation(self, messages: List[Dict]):
         """
         Summarize and store a conversation.
         Also extracts facts to the user profile and people to the relationship graph.
+        With batch summaries enabled this only queues the request - the summary
+        is stored once the batch finishes.
         """
-        summary = self.summarize_conversation(messages)
-        if not summary:
+        if self._batch_queue:
+            if self.client and len(messages) >= 2:
+                # Results arrive later, so the conversation time travels with the request
+                self._batch_queue.enqueue(
+                    f"conv-{uuid.uuid4().hex}",
+                    self._summary_params(_format_conversation(messages)),
+                    meta={"time": time.time()},
+                )
             return
 
+        summary = self.summarize_conversation(messages)
+        if summary:
+            self._apply_summary(summary)
+
+    def _on_batch_result(self, custom_id: str, message, meta: Dict):
+        """Store a summary that came back from the batch API."""
+        when = datetime.fromtimestamp(meta["time"]) if "time" in meta else datetime.now()
+        self._apply_summary(self._parse_summary(message, when))
+
+    def _apply_summary(self, summary: Dict):
+        """Store a summary and fold what it learned into the profile and relationship graph."""
+        with self._lock:
+            self._apply_summary_locked(summary)
+
+    def _apply_summary_locked(self, summary: Dict):
         # Store the summary
         self._data["conversations"].append(summary)
 
@@ -179,6 +269,11 @@ class ConversationStore:
             except Exception as e:
                 print(f"[ConversationStore] Error processing person {person}: {e}")
 
+    def close(self):
+        """Submit any buffered batch requests. Call on shutdown."""
+        if self._batch_queue:
+            self._batch_queue.close()
+
     def get_recent_summaries(self, count: int = 5) -> List[Dict]:
         """Get the most recent conversation summaries."""
         return self._data["conversations"][-count:]
@@ -21,6 +21,7 @@ class RelationshipGraph:
     def __init__(self, store_file: str = "relationships.json"):
         self.store_file = Path(__file__).parent.parent / "data" / store_file
         self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        self._version = 0  # Bumped on every write
         self._load()
 
     def _load(self):
@@ -45,9 +46,14 @@ class RelationshipGraph:
 
     def _save(self):
         """Persist store to disk."""
+        self._version += 1
         with open(self.store_file, "w") as f:
             json.dump(self._data, f, indent=2)
 
+    def version(self) -> int:
+        """Monotonic write counter - lets callers cache derived context."""
+        return self._version
+
     def _generate_key(self, name: str, relationship_type: str = None) -> str:
         """Generate a unique key for a person."""
         base = name.lower().replace(" ", "_")
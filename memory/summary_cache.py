@@ -0,0 +1,118 @@
+"""
+Summary cache - reuses summaries of near-identical conversations.
+Short check-ins tend to repeat themselves, so each summarized conversation is
+embedded and kept; a new conversation close enough to an old one gets the
+old summary instead of another Claude call.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+from openai import OpenAI
+
+from config import config
+
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Rows kept before the least recently used one is evicted
+MAX_ENTRIES = 500
+
+
+class SummaryCache:
+    """
+    Conversation embeddings and their summaries, stored as numpy arrays in
+    data/summary_cache.npz. Embeddings are L2-normalized, so one
+    matrix-vector product gives the cosine similarity to every row.
+    """
+
+    def __init__(self, cache_file: str = "summary_cache.npz", max_entries: int = MAX_ENTRIES):
+        self.cache_file = Path(__file__).parent.parent / "data" / cache_file
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        """Load rows from disk on first use. Caller holds the lock."""
+        if self._loaded:
+            return
+        self._loaded = True
+        self._clear()
+        if not self.cache_file.exists():
+            return
+        try:
+            with np.load(self.cache_file) as data:
+                self._embeddings = data["embeddings"].astype(np.float32)
+                self._summaries = [str(s) for s in data["summaries"]]
+                self._last_used = data["last_used"].astype(np.float64)
+        except Exception as e:
+            print(f"[SummaryCache] Error loading: {e}")
+            self._clear()
+
+    def _clear(self):
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._summaries: list = []
+        self._last_used = np.zeros(0, dtype=np.float64)  # Unix time of last hit
+
+    def _save(self):
+        """Persist rows to disk. Caller holds the lock."""
+        tmp_file = self.cache_file.with_suffix(".tmp.npz")
+        np.savez(
+            tmp_file,
+            embeddings=self._embeddings,
+            summaries=np.array(self._summaries, dtype=str),
+            last_used=self._last_used,
+        )
+        tmp_file.replace(self.cache_file)
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of text, or None if the request failed."""
+        try:
+            response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        except Exception as e:
+            print(f"[SummaryCache] Embedding error: {e}")
+            return None
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, embedding: np.ndarray, threshold: float) -> Optional[Dict]:
+        """The cached summary most similar to embedding, if at least threshold."""
+        with self._lock:
+            self._load()
+            if not self._summaries or self._embeddings.shape[1] != embedding.shape[0]:
+                return None
+            scores = self._embeddings @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < threshold:
+                return None
+            self._last_used[best] = time.time()
+            return json.loads(self._summaries[best])
+
+    def add(self, embedding: np.ndarray, summary: Dict):
+        """Cache a summary, evicting the least recently used row when full."""
+        with self._lock:
+            self._load()
+            if self._summaries and self._embeddings.shape[1] != embedding.shape[0]:
+                self._clear()  # Embedding model changed; old rows can't be compared
+
+            if len(self._summaries) >= self.max_entries:
+                oldest = int(np.argmin(self._last_used))
+                self._embeddings = np.delete(self._embeddings, oldest, axis=0)
+                self._last_used = np.delete(self._last_used, oldest)
+                del self._summaries[oldest]
+
+            row = embedding[np.newaxis, :]
+            self._embeddings = np.vstack([self._embeddings, row]) if self._summaries else row.copy()
+            self._summaries.append(json.dumps(summary))
+            self._last_used = np.append(self._last_used, time.time())
+            try:
+                self._save()
+            except Exception as e:
+                print(f"[SummaryCache] Error saving: {e}")
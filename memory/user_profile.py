@@ -31,6 +31,7 @@ class UserProfile:
     def __init__(self, profile_file: str = "user_profile.json"):
         self.profile_file = Path(__file__).parent.parent / "data" / profile_file
         self.profile_file.parent.mkdir(parents=True, exist_ok=True)
+        self._version = 0  # Bumped on every write
         self._load()
 
     def _load(self):
@@ -92,9 +93,14 @@ class UserProfile:
 
     def _save(self):
         """Persist profile to disk."""
+        self._version += 1
         with open(self.profile_file, "w") as f:
             json.dump(self._data, f, indent=2)
 
+    def version(self) -> int:
+        """Monotonic write counter - lets callers cache derived context."""
+        return self._version
+
     def _calculate_effective_confidence(self, fact: Dict) -> float:
         """
         Calculate effective confidence with decay over time.
@@ -13,10 +13,15 @@ from personality.alfred import ALFRED_SYSTEM_PROMPT, get_greeting_prompt
 class GreetingGenerator:
     """Generates greetings using Claude."""
 
-    def __init__(self):
+    @staticmethod
+    def check_config():
+        """Raise ValueError if the Anthropic key is missing."""
         if not config.ANTHROPIC_API_KEY:
             raise ValueError("ANTHROPIC_API_KEY not configured")
 
+    def __init__(self):
+        self.check_config()
+
         self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
 
     def generate(self, context: dict) -> Optional[str]:
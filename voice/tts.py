@@ -3,23 +3,79 @@ Text-to-speech using ElevenLabs with streaming support.
 """
 
 import io
+import queue
+import re
+import threading
 import requests
-from typing import Optional, Generator
+from typing import Iterable, Iterator, Optional, Generator
 
 from config import config
 
 
+# A sentence ends at . ! or ? followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Don't hand TTS fragments shorter than this (e.g. "Mr." or "Yes.")
+MIN_SENTENCE_CHARS = 20
+
+
+def iter_sentences(text_chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Regroup streamed text chunks into whole sentences, so speech can start
+    on the first sentence while the rest is still being generated.
+    """
+    buffer = ""
+    for chunk in text_chunks:
+        buffer += chunk
+        parts = _SENTENCE_END.split(buffer)
+        if len(parts) < 2:
+            continue
+        # Everything but the last part is complete
+        ready = ""
+        for part in parts[:-1]:
+            ready = f"{ready} {part}" if ready else part
+            if len(ready) >= MIN_SENTENCE_CHARS:
+                yield ready
+                ready = ""
+        buffer = f"{ready} {parts[-1]}" if ready else parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def prefetch(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Start consuming chunks on a background thread right away and return an
+    iterator over them, so synthesis can run while earlier audio plays.
+    """
+    buffered: queue.SimpleQueue = queue.SimpleQueue()
+
+    def pull():
+        try:
+            for chunk in chunks:
+                buffered.put(chunk)
+        finally:
+            buffered.put(None)
+
+    threading.Thread(target=pull, name="tts-prefetch", daemon=True).start()
+    return iter(buffered.get, None)
+
+
 class TextToSpeech:
     """ElevenLabs TTS integration with streaming."""
 
     BASE_URL = "https://api.elevenlabs.io/v1"
 
-    def __init__(self):
+    @staticmethod
+    def check_config():
+        """Raise ValueError if the ElevenLabs settings are missing."""
         if not config.ELEVENLABS_API_KEY:
             raise ValueError("ELEVENLABS_API_KEY not configured")
         if not config.ELEVENLABS_VOICE_ID:
             raise ValueError("ELEVENLABS_VOICE_ID not configured")
 
+    def __init__(self):
+        self.check_config()
+
         self.api_key = config.ELEVENLABS_API_KEY
         self.voice_id = config.ELEVENLABS_VOICE_ID
 